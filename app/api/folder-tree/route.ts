@@ -0,0 +1,117 @@
+import { createClient } from "@/lib/supabase/server"
+import {
+  buildFolderTree,
+  sameSnapshotSource,
+  type FolderSnapshot,
+  type FolderSnapshotSource,
+} from "@/lib/folder-snapshot"
+import { createHash } from "crypto"
+import fs from "fs/promises"
+import path from "path"
+import { NextRequest, NextResponse } from "next/server"
+
+// Written by temp/build_folder_snapshot.py
+const FOLDER_SNAPSHOT_PATH = path.join(process.cwd(), "data", "folder-tree.json")
+
+type SupabaseClient = Awaited<ReturnType<typeof createClient>>
+
+async function readFolderSnapshot(): Promise<FolderSnapshot | null> {
+  try {
+    return JSON.parse(await fs.readFile(FOLDER_SNAPSHOT_PATH, "utf-8")) as FolderSnapshot
+  } catch {
+    return null
+  }
+}
+
+// Single-row read of the change counter the folders/documents triggers bump (scripts/031),
+// so checking freshness costs no COUNT(*) over documents
+async function fetchSource(supabase: SupabaseClient): Promise<FolderSnapshotSource | null> {
+  const { data, error } = await supabase.from("folder_tree_state").select("changes").maybeSingle()
+  if (error || !data) {
+    console.error("[v0] Error checking folder snapshot freshness:", error)
+    return null
+  }
+  return { changes: data.changes }
+}
+
+// Same tree as the snapshot, assembled from folders + folder_document_counts
+async function buildLiveSnapshot(supabase: SupabaseClient, source: FolderSnapshotSource | null): Promise<FolderSnapshot> {
+  const { data: folders, error: foldersError } = await supabase
+    .from("folders")
+    .select(`
+      id,
+      name,
+      full_path,
+      level,
+      parent_id,
+      folder_document_counts(document_count)
+    `)
+    .order("full_path")
+    .limit(10000)
+
+  if (foldersError) {
+    console.error("[v0] Error fetching folders:", foldersError)
+  }
+
+  const { count: unassigned, error: unassignedError } = await supabase
+    .from("documents")
+    .select("id", { count: "exact", head: true })
+    .is("folder_id", null)
+
+  if (unassignedError) {
+    console.error("[v0] Error fetching unassigned document count:", unassignedError)
+  }
+
+  // Extract document counts from the nested folder_document_counts array
+  const counts: Record<string, number> = {}
+  const rows = (folders || []).map((folder: any) => {
+    const viewCounts = folder.folder_document_counts
+    if (Array.isArray(viewCounts) && viewCounts.length > 0) {
+      counts[folder.id] = viewCounts[0].document_count || 0
+    } else if (viewCounts && typeof viewCounts === "object") {
+      counts[folder.id] = viewCounts.document_count || 0
+    }
+    return { id: folder.id, name: folder.name, full_path: folder.full_path, level: folder.level, parent_id: folder.parent_id }
+  })
+
+  const roots = buildFolderTree(rows, counts)
+  const total = roots.reduce((sum, node) => sum + node.total, 0) + (unassigned || 0)
+  return {
+    version: createHash("sha256")
+      .update(JSON.stringify([roots, unassigned || 0]))
+      .digest("hex")
+      .slice(0, 16),
+    generated_at: new Date().toISOString(),
+    documents: total,
+    unassigned: unassigned || 0,
+    source: source || undefined,
+    folders: roots,
+  }
+}
+
+export async function GET(request: NextRequest) {
+  const supabase = await createClient()
+
+  const {
+    data: { user },
+  } = await supabase.auth.getUser()
+
+  if (!user) {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 })
+  }
+
+  // Serve the precomputed snapshot only while no folder or document write has happened since it
+  // was built (e.g. by the drive watcher); otherwise fall back to the live queries until it is rebuilt
+  const [snapshot, source] = await Promise.all([readFolderSnapshot(), fetchSource(supabase)])
+  const fresh = snapshot && source && sameSnapshotSource(snapshot.source, source)
+  const tree = snapshot && fresh ? snapshot : await buildLiveSnapshot(supabase, source)
+
+  const etag = `"${tree.version}"`
+  const headers = { ETag: etag, "Cache-Control": "private, no-cache", "X-Folder-Tree": fresh ? "snapshot" : "live" }
+
+  if (request.headers.get("if-none-match") === etag) {
+    return new NextResponse(null, { status: 304, headers })
+  }
+
+  return NextResponse.json(tree, { headers })
+}
@@ -0,0 +1,34 @@
+import { createClient } from "@/lib/supabase/server"
+import fs from "fs/promises"
+import path from "path"
+import { NextRequest, NextResponse } from "next/server"
+
+// Written by temp/generate_thumbnails.py as <hash[:2]>/<hash>.jpg
+const THUMBNAIL_DIR = path.join(process.cwd(), "data", "thumbnails")
+
+export async function GET(_request: NextRequest, { params }: { params: Promise<{ hash: string }> }) {
+  const supabase = await createClient()
+
+  const {
+    data: { user },
+  } = await supabase.auth.getUser()
+
+  if (!user) {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 })
+  }
+
+  const { hash } = await params
+  if (!/^[0-9a-f]{64}$/.test(hash)) {
+    return NextResponse.json({ error: "Invalid thumbnail id" }, { status: 400 })
+  }
+
+  try {
+    const image = await fs.readFile(path.join(THUMBNAIL_DIR, hash.slice(0, 2), `${hash}.jpg`))
+    // Content-addressed: a given URL never changes
+    return new NextResponse(image, {
+      headers: { "Content-Type": "image/jpeg", "Cache-Control": "private, max-age=31536000, immutable" },
+    })
+  } catch {
+    return NextResponse.json({ error: "Thumbnail not found" }, { status: 404 })
+  }
+}
@@ -35,37 +35,10 @@ export default async function ClassifyPage() {
     .select("id, name, division_id")
     .order("name")
 
-  // Fetch folders for filtering with document counts from materialized view
-  const { data: folders, error: foldersError } = await supabase
-    .from("folders")
-    .select(`
-      id,
-      name,
-      full_path,
-      level,
-      parent_id,
-      folder_document_counts(document_count)
-    `)
-    .order("full_path")
-    .limit(10000)
-
   if (edError || secError || divError || deptError) {
     console.error("[v0] Error fetching organizational structure:", { edError, secError, divError, deptError })
   }
 
-  if (foldersError) {
-    console.error("[v0] Error fetching folders:", foldersError)
-  }
-
-  const { count: unassignedCount, error: unassignedError } = await supabase
-    .from("documents")
-    .select("id", { count: "exact", head: true })
-    .is("folder_id", null)
-
-  if (unassignedError) {
-    console.error("[v0] Error fetching unassigned document count:", unassignedError)
-  }
-
   // Build the hierarchical structure manually
   const organizationalStructure = (executiveDirectors || []).map((ed) => ({
     ...ed,
@@ -82,40 +55,6 @@ export default async function ClassifyPage() {
       })),
   }))
 
-  // Extract document counts from the nested folder_document_counts array
-  const folderDocumentCounts: Record<string, number> = {}
-  const processedFolders = (folders || []).map((folder: any) => {
-    const counts = folder.folder_document_counts
-    if (Array.isArray(counts) && counts.length > 0) {
-      folderDocumentCounts[folder.id] = counts[0].document_count || 0
-    } else if (counts && typeof counts === 'object') {
-      folderDocumentCounts[folder.id] = counts.document_count || 0
-    } else {
-      folderDocumentCounts[folder.id] = 0
-    }
-    return {
-      id: folder.id,
-      name: folder.name,
-      full_path: folder.full_path,
-      level: folder.level,
-      parent_id: folder.parent_id,
-    }
-  })
-
-  const UNASSIGNED_FOLDER_ID = "__UNASSIGNED__"
-  folderDocumentCounts[UNASSIGNED_FOLDER_ID] = unassignedCount || 0
-
-  const allFolders = [
-    {
-      id: UNASSIGNED_FOLDER_ID,
-      name: "Unassigned",
-      full_path: "Unassigned",
-      level: 0,
-      parent_id: null,
-    },
-    ...processedFolders,
-  ]
-
   return (
     <>
       <Navigation />
@@ -129,8 +68,6 @@ export default async function ClassifyPage() {
           </div>
           <ClassificationInterface
             organizationalStructure={organizationalStructure}
-            folders={allFolders}
-            documentCounts={folderDocumentCounts}
           />
         </div>
       </main>
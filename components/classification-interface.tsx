@@ -38,6 +38,7 @@ import {
 } from "lucide-react"
 import type { Database } from "@/lib/types"
 import { FolderFilterDrawer } from "@/components/folder-filter-drawer"
+import { flattenFolderSnapshot, UNASSIGNED_FOLDER_ID, type FolderSnapshot } from "@/lib/folder-snapshot"
 import type { FolderNode } from "@/components/folder-tree"
 
 type Document = Database["public"]["Tables"]["documents"]["Row"]
@@ -88,13 +89,11 @@ type DocumentType = {
   name: string
 }
 
-const UNASSIGNED_FOLDER_ID = "__UNASSIGNED__"
-
 export function ClassificationInterface({
   documents = [],
   organizationalStructure,
-  folders = [],
-  documentCounts = {},
+  folders: initialFolders = [],
+  documentCounts: initialDocumentCounts = {},
 }: ClassificationInterfaceProps) {
   const [unclassifiedDocs, setUnclassifiedDocs] = useState(documents?.filter((d) => d.status !== "classified") || [])
   const [classifiedDocs, setClassifiedDocs] = useState<ClassifiedDocument[]>([])
@@ -161,6 +160,14 @@ export function ClassificationInterface({
   // Bulk classification staging state
   const [stagedClassification, setStagedClassification] = useState<DocumentClassification>({})
 
+  // Folder filter tree from /api/folder-tree (precomputed snapshot, revalidated by ETag)
+  const [folders, setFolders] = useState<FolderNode[]>(initialFolders)
+  const [documentCounts, setDocumentCounts] = useState<Record<string, number>>(initialDocumentCounts)
+
+  useEffect(() => {
+    fetchFolderTree()
+  }, [])
+
   useEffect(() => {
     fetchClassifiedDocuments()
     fetchDocumentTypes()
@@ -176,6 +183,20 @@ export function ClassificationInterface({
     }
   }, [selectedUnclassifiedIds.size])
 
+  const fetchFolderTree = async () => {
+    try {
+      const response = await fetch("/api/folder-tree")
+      if (!response.ok) throw new Error(`Folder tree request failed: ${response.status}`)
+      const { folders: folderRows, documentCounts: counts } = flattenFolderSnapshot(
+        (await response.json()) as FolderSnapshot,
+      )
+      setFolders(folderRows)
+      setDocumentCounts(counts)
+    } catch (error) {
+      console.error("Error fetching folder tree:", error)
+    }
+  }
+
   const fetchDivisionColors = async () => {
     const supabase = createClient()
     const { data, error } = await supabase.from("divisions").select("id, name, color")
@@ -535,10 +556,35 @@ export function ClassificationInterface({
           `This document belongs to group "${selectedDoc.group_name}". Classify all ${unclassifiedDocs.filter((d) => d.group_name === selectedDoc.group_name).length} files in this group?`,
         )
 
+      // Otherwise offer the title cluster (near-identical names, see temp/cluster_titles.py).
+      // title_cluster_size includes members already classified, so count the unclassified rest
+      let unclassifiedClusterMembers = 0
+      if (!shouldClassifyGroup && selectedDoc?.title_cluster_id && (selectedDoc.title_cluster_size || 0) > 1) {
+        const { count, error } = await supabase
+          .from("documents")
+          .select("id", { count: "exact", head: true })
+          .eq("title_cluster_id", selectedDoc.title_cluster_id)
+          .is("priority", null)
+          .is("access_level", null)
+          .neq("id", selectedDoc.id)
+        if (error) {
+          console.error("[v0] Error counting cluster members:", error)
+        }
+        unclassifiedClusterMembers = count || 0
+      }
+
+      const shouldClassifyCluster =
+        unclassifiedClusterMembers > 0 &&
+        confirm(
+          `This document has ${unclassifiedClusterMembers} similarly named unclassified files. Classify them too?`,
+        )
+
       const docsToClassify =
         shouldClassifyGroup && selectedDoc?.group_name
           ? unclassifiedDocs.filter((d) => d.group_name === selectedDoc.group_name)
-          : [selectedDoc].filter(Boolean)
+          : shouldClassifyCluster
+            ? unclassifiedDocs.filter((d) => d.title_cluster_id === selectedDoc!.title_cluster_id)
+            : [selectedDoc].filter(Boolean)
 
       console.log("[v0] Documents to classify:", docsToClassify.length)
 
@@ -565,6 +611,31 @@ export function ClassificationInterface({
         console.log("[v0] Successfully updated document:", update.id)
       }
 
+      if (shouldClassifyCluster && updates.length > 0) {
+        // Cluster members on other pages: one set-based update for the rest of the cluster,
+        // classified like the selected document
+        const clusterUpdate = {
+          executive_director_id: classification.executiveDirectorId,
+          secretary_id: classification.secretaryId,
+          division_id: classification.divisionId,
+          department_id: departmentId,
+          access_level: classification.access_level,
+          priority: classification.priority || selectedDoc!.priority,
+          status: "classified",
+          classified_at: new Date().toISOString(),
+        }
+        const { error } = await supabase
+          .from("documents")
+          .update(clusterUpdate)
+          .eq("title_cluster_id", selectedDoc!.title_cluster_id!)
+          .is("priority", null)
+          .is("access_level", null)
+        if (error) {
+          console.error("[v0] Cluster update error:", error)
+          throw error
+        }
+      }
+
       const classifiedIds = docsToClassify.map((d) => d!.id)
       setUnclassifiedDocs((prev) => prev.filter((doc) => !classifiedIds.includes(doc.id)))
       setClassifications((prev) => {
@@ -1887,6 +1958,16 @@ export function ClassificationInterface({
                 <p className="text-sm text-muted-foreground text-center py-4">Select a document to add a path</p>
               ) : (
                 <div className="space-y-2">
+                  {selectedDoc?.thumbnail_url && (
+                    <a href={buildOpenLink(selectedDoc)} target="_blank" rel="noopener noreferrer" className="block">
+                      <img
+                        src={selectedDoc.thumbnail_url}
+                        alt={`Preview of ${selectedDoc.title}`}
+                        loading="lazy"
+                        className="w-full max-h-64 object-contain rounded border bg-muted"
+                      />
+                    </a>
+                  )}
                   <div className="space-y-1">
                     <p className="text-xs text-muted-foreground">Folder Path (for filtering)</p>
                     <Input
@@ -0,0 +1,71 @@
+// Folder tree snapshot, as written by temp/build_folder_snapshot.py and served by /api/folder-tree
+
+export interface FolderSnapshotNode {
+  id: string
+  name: string
+  path: string
+  count: number
+  total: number
+  children: FolderSnapshotNode[]
+}
+
+// folder_tree_state.changes when the snapshot was built (scripts/031), used to detect a stale file
+export interface FolderSnapshotSource {
+  changes: number
+}
+
+export interface FolderSnapshot {
+  version: string
+  generated_at: string
+  documents: number
+  unassigned: number
+  source?: FolderSnapshotSource
+  folders: FolderSnapshotNode[]
+}
+
+export type FolderRow = { id: string; name: string; full_path: string; level: number; parent_id: string | null }
+
+export const UNASSIGNED_FOLDER_ID = "__UNASSIGNED__"
+
+export function sameSnapshotSource(a: FolderSnapshotSource | undefined, b: FolderSnapshotSource) {
+  return !!a && a.changes === b.changes
+}
+
+// Nest folder rows (ordered by full_path) and roll direct counts up to every ancestor
+export function buildFolderTree(rows: FolderRow[], counts: Record<string, number>) {
+  const nodes = new Map<string, FolderSnapshotNode>()
+  rows.forEach((row) =>
+    nodes.set(row.id, { id: row.id, name: row.name, path: row.full_path, count: counts[row.id] || 0, total: 0, children: [] }),
+  )
+
+  const roots: FolderSnapshotNode[] = []
+  rows.forEach((row) => {
+    const parent = row.parent_id ? nodes.get(row.parent_id) : undefined
+    ;(parent ? parent.children : roots).push(nodes.get(row.id)!)
+  })
+
+  const rollUp = (node: FolderSnapshotNode): number => {
+    node.total = node.count + node.children.reduce((sum, child) => sum + rollUp(child), 0)
+    return node.total
+  }
+  roots.forEach(rollUp)
+  return roots
+}
+
+// Flatten to the shape the folder filter takes: folder rows plus direct document counts by id,
+// with the virtual "Unassigned" folder first
+export function flattenFolderSnapshot(snapshot: FolderSnapshot) {
+  const folders: FolderRow[] = [
+    { id: UNASSIGNED_FOLDER_ID, name: "Unassigned", full_path: "Unassigned", level: 0, parent_id: null },
+  ]
+  const documentCounts: Record<string, number> = { [UNASSIGNED_FOLDER_ID]: snapshot.unassigned }
+
+  const visit = (node: FolderSnapshotNode, level: number, parentId: string | null) => {
+    folders.push({ id: node.id, name: node.name, full_path: node.path, level, parent_id: parentId })
+    documentCounts[node.id] = node.count
+    node.children.forEach((child) => visit(child, level + 1, node.id))
+  }
+  snapshot.folders.forEach((root) => visit(root, 0, null))
+
+  return { folders, documentCounts }
+}
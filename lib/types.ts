@@ -44,6 +44,9 @@ export interface Document {
   folder_id?: string | null
   path?: string | null
   group_name?: string | null
+  thumbnail_url?: string | null
+  title_cluster_id?: string | null
+  title_cluster_size?: number | null
 }
 
 // Database type for Supabase typing (simplified version)
@@ -0,0 +1,16 @@
+-- Store document and folder paths in the canonical form written by the ingest scripts
+-- (temp/drive_paths.py): '/' separators, Unicode NFC, no leading/trailing/repeated slashes.
+-- Older Windows crawls stored backslash paths, which never matched folder prefixes in LIKE
+-- because '\' is LIKE's escape character.
+BEGIN;
+
+UPDATE documents
+SET path = normalize(regexp_replace(trim(both '/' from replace(path, '\', '/')), '/+', '/', 'g'), NFC)
+WHERE path IS NOT NULL
+  AND (position('\' in path) > 0 OR path ~ '(^/|/$|//)' OR path IS NOT NFC NORMALIZED);
+
+UPDATE folders
+SET full_path = normalize(regexp_replace(trim(both '/' from replace(full_path, '\', '/')), '/+', '/', 'g'), NFC)
+WHERE position('\' in full_path) > 0 OR full_path ~ '(^/|/$|//)' OR full_path IS NOT NFC NORMALIZED;
+
+COMMIT;
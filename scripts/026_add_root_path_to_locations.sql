@@ -0,0 +1,5 @@
+-- Add root_path to locations so the crawler can crawl every storage location in one run
+ALTER TABLE locations ADD COLUMN IF NOT EXISTS root_path TEXT;
+
+-- Add comment to explain the column
+COMMENT ON COLUMN locations.root_path IS 'Local directory crawled for this location by temp/crawl_google_drive.py --from-db (NULL = not crawled)';
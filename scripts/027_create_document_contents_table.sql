@@ -0,0 +1,31 @@
+-- Store extracted document body text for full-text search (filled by temp/extract_text.py)
+-- Kept out of documents so SELECT * on documents stays small
+CREATE TABLE IF NOT EXISTS document_contents (
+  document_id UUID PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+  content_hash TEXT NOT NULL,
+  content_text TEXT NOT NULL,
+  content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', content_text)) STORED,
+  extracted_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- GIN index answers body-text queries (content_tsv @@ websearch_to_tsquery('english', ...))
+CREATE INDEX IF NOT EXISTS idx_document_contents_tsv
+  ON public.document_contents USING GIN (content_tsv);
+
+CREATE INDEX IF NOT EXISTS idx_document_contents_hash
+  ON public.document_contents (content_hash);
+
+-- Enable Row Level Security
+ALTER TABLE document_contents ENABLE ROW LEVEL SECURITY;
+
+-- Allow authenticated users to read extracted text
+CREATE POLICY "Allow authenticated users to read document contents"
+  ON document_contents
+  FOR SELECT
+  TO authenticated
+  USING (true);
+
+-- Add comment to explain the table
+COMMENT ON TABLE document_contents IS 'Extracted body text of PDF/DOCX/TXT documents, keyed by document';
+COMMENT ON COLUMN document_contents.content_hash IS 'SHA-256 of the source file; text is only replaced when this changes';
+COMMENT ON COLUMN document_contents.content_tsv IS 'English tsvector of content_text, GIN indexed for full-text search';
@@ -0,0 +1,5 @@
+-- Add thumbnail_url to documents for image/PDF previews rendered by temp/generate_thumbnails.py
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS thumbnail_url TEXT;
+
+-- Add comment to explain the column
+COMMENT ON COLUMN documents.thumbnail_url IS 'Content-addressed preview image served by the app (/api/thumbnails/<hash>), NULL if none has been rendered';
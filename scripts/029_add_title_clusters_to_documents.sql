@@ -0,0 +1,11 @@
+-- Add title cluster columns so near-identically named documents can be classified together
+ALTER TABLE documents
+ADD COLUMN IF NOT EXISTS title_cluster_id TEXT,
+ADD COLUMN IF NOT EXISTS title_cluster_size INTEGER;
+
+-- Create index for classifying a whole cluster at once
+CREATE INDEX IF NOT EXISTS idx_documents_title_cluster_id ON documents(title_cluster_id);
+
+-- Add comments to explain the columns
+COMMENT ON COLUMN documents.title_cluster_id IS 'Near-duplicate title cluster written by temp/cluster_titles.py (NULL = no similar titles)';
+COMMENT ON COLUMN documents.title_cluster_size IS 'Number of documents in the title cluster';
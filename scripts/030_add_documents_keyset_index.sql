@@ -0,0 +1,4 @@
+-- Keyset pagination index for streaming exports (temp/export_documents.py):
+-- each page is a range scan starting after the last (created_at, id) seen
+CREATE INDEX IF NOT EXISTS idx_documents_created_at_id
+  ON public.documents (created_at, id);
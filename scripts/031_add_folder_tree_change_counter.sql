@@ -0,0 +1,45 @@
+-- Change counter for the folder tree snapshot (temp/build_folder_snapshot.py, /api/folder-tree).
+-- Bumped once per statement that can change the tree: any write to folders (including the
+-- watcher's renames/moves of whole subtrees) and document inserts, deletes and folder_id
+-- updates (files moved between folders). Reading it is a single-row lookup, unlike COUNT(*).
+CREATE TABLE IF NOT EXISTS folder_tree_state (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  changes BIGINT NOT NULL DEFAULT 0,
+  changed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO folder_tree_state (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+
+-- Enable Row Level Security
+ALTER TABLE folder_tree_state ENABLE ROW LEVEL SECURITY;
+
+-- Allow authenticated users to read the counter
+CREATE POLICY "Allow authenticated users to read folder tree state"
+  ON folder_tree_state
+  FOR SELECT
+  TO authenticated
+  USING (true);
+
+-- Create function to bump the counter (SECURITY DEFINER so any writer can bump it)
+CREATE OR REPLACE FUNCTION public.bump_folder_tree_changes()
+RETURNS trigger AS $$
+BEGIN
+  UPDATE public.folder_tree_state SET changes = changes + 1, changed_at = NOW();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE TRIGGER trigger_bump_folder_tree_on_folder_change
+AFTER INSERT OR UPDATE OR DELETE ON public.folders
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.bump_folder_tree_changes();
+
+-- Classification updates do not touch folder_id and leave the counter alone
+CREATE OR REPLACE TRIGGER trigger_bump_folder_tree_on_document_change
+AFTER INSERT OR DELETE OR UPDATE OF folder_id ON public.documents
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.bump_folder_tree_changes();
+
+-- Add comment to explain the table
+COMMENT ON TABLE folder_tree_state IS 'Single row; changes is bumped by every statement that can change the folder tree';
+COMMENT ON COLUMN folder_tree_state.changes IS 'Stored as the folder tree snapshot source; a different value means the snapshot is stale';
@@ -6,7 +6,9 @@ Generates file:// URLs for local Google Drive files
 
 import csv
 import os
-import urllib.parse
+
+from drive_paths import file_url, split_archive_path
+from manifest_reader import PATH, iter_manifest
 
 CSV_INPUT = "google_drive_documents.csv"
 CSV_OUTPUT = "google_drive_documents_with_urls.csv"
@@ -15,32 +17,21 @@ DRIVE_ROOT = r"G:\My Drive\scientology\LRH-site"
 def generate_csv_with_urls(input_csv, output_csv):
     print(f"[INFO] Reading {input_csv}")
     
-    with open(input_csv, 'r', encoding='utf-8') as infile:
-        reader = csv.DictReader(infile)
-        rows = list(reader)
-    
-    print(f"[INFO] Processing {len(rows)} documents")
-    
-    # Add file_url column
-    for row in rows:
-        path = row['Path']
-        
-        # Build full local path
-        full_path = os.path.join(DRIVE_ROOT, path)
-        
-        # Convert to file:// URL (with proper encoding)
-        file_url = "file:///" + full_path.replace("\\", "/")
-        
-        row['File URL'] = file_url
-    
-    # Write new CSV
+    # Write new CSV, streaming rows straight through with the file_url column added
     fieldnames = ['Document Name', 'Location', 'Path', 'File URL']
+    count = 0
     
     with open(output_csv, 'w', newline='', encoding='utf-8') as outfile:
-        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+        writer = csv.writer(outfile)
+        writer.writerow(fieldnames)
+        for row in iter_manifest(input_csv):
+            # Convert to file:// URL (with proper encoding), independent of host OS;
+            # files inside an archive link to the archive itself
+            archive_path, _ = split_archive_path(row[PATH])
+            writer.writerow((*row, file_url(DRIVE_ROOT, archive_path)))
+            count += 1
     
+    print(f"[INFO] Processed {count} documents")
     print(f"[SUCCESS] Created {output_csv}")
     print(f"[INFO] Now contains file:// URLs for local files")
 
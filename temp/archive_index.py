@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Archive Index
+Lists the files inside ZIP and RAR archives found by the crawler, so documents
+buried in archives become searchable rows of their own.
+
+Only the archive index is read (the ZIP central directory at the end of the
+file, or the RAR file headers); nothing is extracted. Each member becomes a
+manifest row with a virtual path (see drive_paths.ARCHIVE_SEPARATOR):
+
+  Lectures/tapes.zip!/1954/ACC_05.pdf
+
+Archives are listed on a thread pool. Archives larger than the size cap are
+skipped, since Google Drive for desktop may have to download a streamed file
+before it can be opened, and at most MAX_MEMBERS members are listed per archive.
+
+RAR support is optional:
+  pip install rarfile
+"""
+
+from __future__ import annotations
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from drive_paths import ARCHIVE_EXTENSIONS, archive_member_path, split_path
+from ingest_metrics import Metrics
+
+MAX_ARCHIVE_MB = 2048
+MAX_MEMBERS = 100_000
+
+
+def list_zip(path: str) -> list[str]:
+    # ZipFile reads only the central directory when opened
+    with zipfile.ZipFile(path) as archive:
+        return [info.filename for info in archive.infolist() if not info.is_dir()]
+
+
+def list_rar(path: str) -> list[str]:
+    import rarfile
+
+    with rarfile.RarFile(path) as archive:
+        return [info.filename for info in archive.infolist() if not info.is_dir()]
+
+
+LISTERS = {"zip": list_zip, "rar": list_rar}
+
+
+def list_archive(full_path: str, max_bytes: int) -> tuple[list[str], str | None]:
+    """
+    Return (member paths, skip reason). Members are empty when the archive is
+    skipped for its size or cannot be read.
+    """
+    try:
+        if os.path.getsize(full_path) > max_bytes:
+            return [], "over size cap"
+        ext = full_path.rsplit(".", 1)[-1].lower()
+        return LISTERS[ext](full_path)[:MAX_MEMBERS], None
+    except ImportError:
+        return [], "rarfile not installed"
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
+
+
+def index_archives(documents: list[dict], root_path: str, max_mb: int = MAX_ARCHIVE_MB,
+                   workers: int | None = None, metrics: Metrics | None = None) -> list[dict]:
+    """
+    List every ZIP/RAR archive among documents (crawler rows under root_path)
+    and return one manifest row per file inside them.
+    """
+    metrics = metrics or Metrics("archives")
+    archives = [
+        doc for doc in documents
+        if doc['Path'].rsplit(".", 1)[-1].lower() in ARCHIVE_EXTENSIONS
+    ]
+    if not archives:
+        return []
+
+    print(f"[INFO] Indexing {len(archives)} archives under {root_path}")
+    full_paths = [os.path.join(root_path, *split_path(doc['Path'])) for doc in archives]
+    members = []
+
+    with metrics.stage("archives"), ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(list_archive, full_paths, [max_mb * 1_048_576] * len(full_paths))
+        for doc, (names, skipped) in zip(archives, results):
+            metrics.count("archives")
+            if skipped:
+                print(f"   [WARNING] Skipped {doc['Path']}: {skipped}")
+                metrics.count("skipped")
+                continue
+            for name in names:
+                segments = split_path(name)
+                if not segments:
+                    continue
+                members.append({
+                    'Document Name': segments[-1],
+                    'Location': doc['Location'],
+                    'Path': archive_member_path(doc['Path'], name)
+                })
+                metrics.count("members")
+
+    print(f"[SUCCESS] Found {len(members)} files inside archives")
+    return members
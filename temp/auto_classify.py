@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Rule-Based Auto-Classification
+Classifies imported documents from their folder paths so the bulk of the
+unclassified backlog doesn't have to go through the UI one document at a time.
+
+Rules live in a JSON list (see classification_rules.example.json):
+
+  {"match": "Treasury", "division": "Treasury Division"}
+  {"match": "Treasury/Income", "department": "Department of Income"}
+  {"match": "/Admin/*/Routing", "department": "Department of Routing and Personnel"}
+
+"match" is a sequence of folder names compared case-insensitively. It matches
+anywhere in a document's folder path unless it starts with '/', which anchors
+it to the root; '*' matches any single folder. A rule names either a
+department or a division (from the org structure seeded by
+scripts/011_restore_actual_divisions.sql); executive director, secretary and
+division are filled in from it.
+
+All rules are compiled into one segment trie and the manifest is matched in a
+single pass, once per distinct folder. When several rules match a folder they
+must agree: one division at most, one department at most, and the department
+inside that division. Otherwise the folder is reported as a conflict and left
+alone.
+
+Matches only pre-fill the org fields (executive director, secretary, division
+and department). A document counts as classified in the UI once it has a
+priority or access level, which no folder rule can decide, so status is left
+alone and every document stays in the classify queue for review.
+
+Matches are applied with one set-based UPDATE that never touches documents
+the UI already treats as classified (priority or access level set).
+
+Install dependency:
+  pip install psycopg2-binary
+
+Usage:
+  python auto_classify.py --rules classification_rules.json
+  python auto_classify.py --rules classification_rules.json --report-only
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+from collections import Counter
+
+from db_connection import connect, copy_rows
+from drive_paths import SEPARATOR, normalize_path, segment_key, split_folder, split_path
+from ingest_metrics import Metrics, add_arguments, profiled
+from manifest_reader import iter_manifest
+
+CSV_FILE = "google_drive_documents.csv"
+REPORT_FILE = "auto_classify_report.json"
+WILDCARD = "*"
+REPORT_TOP = 25
+
+# Positions in a resolved target tuple
+EXECUTIVE_DIRECTOR, SECRETARY, DIVISION, DEPARTMENT = 0, 1, 2, 3
+
+
+class RuleNode:
+    """One folder name in the rule trie; rules lists the indexes of rules ending here."""
+
+    __slots__ = ("children", "wildcard", "rules")
+
+    def __init__(self):
+        self.children: dict[str, RuleNode] = {}
+        self.wildcard: RuleNode | None = None
+        self.rules: list[int] = []
+
+
+class RuleMatcher:
+    """All rule patterns compiled into two segment tries (root-anchored and floating)."""
+
+    def __init__(self, patterns: list[str]):
+        self.anchored = RuleNode()
+        self.floating = RuleNode()
+        for i, pattern in enumerate(patterns):
+            node = self.anchored if pattern.startswith(SEPARATOR) else self.floating
+            for segment in split_path(pattern):
+                if segment == WILDCARD:
+                    node.wildcard = node.wildcard or RuleNode()
+                    node = node.wildcard
+                else:
+                    node = node.children.setdefault(segment_key(segment), RuleNode())
+            node.rules.append(i)
+
+    @staticmethod
+    def _walk(node: RuleNode, keys: list[str], pos: int, found: set[int]):
+        found.update(node.rules)
+        if pos == len(keys):
+            return
+        child = node.children.get(keys[pos])
+        if child:
+            RuleMatcher._walk(child, keys, pos + 1, found)
+        if node.wildcard:
+            RuleMatcher._walk(node.wildcard, keys, pos + 1, found)
+
+    def match(self, keys: list[str]) -> set[int]:
+        """Return the indexes of every rule matching the folder given as segment keys."""
+        found: set[int] = set()
+        if keys:
+            self._walk(self.anchored, keys, 0, found)
+            for start in range(len(keys)):
+                self._walk(self.floating, keys, start, found)
+        return found
+
+
+def load_rules(rules_path: str) -> list[dict]:
+    """Read rules from a JSON list of {"match", "division" | "department"} objects."""
+    with open(rules_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+
+    rules = []
+    for i, entry in enumerate(entries):
+        if not split_path(entry.get("match", "")):
+            raise ValueError(f"{rules_path}: rule {i} needs a non-empty 'match'")
+        if bool(entry.get("division")) == bool(entry.get("department")):
+            raise ValueError(f"{rules_path}: rule {i} needs exactly one of 'division' or 'department'")
+        rules.append(entry)
+    return rules
+
+
+def load_org_targets(cur) -> tuple[dict, dict]:
+    """
+    Return ({division name: target}, {department name: target}) with names case-folded
+    and each target an (executive_director_id, secretary_id, division_id, department_id) tuple.
+    """
+    cur.execute(
+        """
+        SELECT v.name, dp.name, s.executive_director_id, s.id, v.id, dp.id
+        FROM divisions v
+        LEFT JOIN secretaries s ON s.id = v.secretary_id
+        LEFT JOIN departments dp ON dp.division_id = v.id
+        """
+    )
+    divisions, departments = {}, {}
+    for division, department, executive_director_id, secretary_id, division_id, department_id in cur.fetchall():
+        divisions[division.casefold()] = (executive_director_id, secretary_id, division_id, None)
+        if department:
+            departments[department.casefold()] = (executive_director_id, secretary_id, division_id, department_id)
+    return divisions, departments
+
+
+def resolve_targets(rules: list[dict], divisions: dict, departments: dict) -> list[tuple]:
+    """Map each rule to its org target tuple; unknown names are an error."""
+    targets, unknown = [], []
+    for rule in rules:
+        if rule.get("department"):
+            target = departments.get(rule["department"].casefold())
+        else:
+            target = divisions.get(rule["division"].casefold())
+        if target is None:
+            unknown.append(rule.get("department") or rule["division"])
+        targets.append(target)
+    if unknown:
+        raise ValueError(f"Unknown division/department names in rules: {', '.join(sorted(set(unknown)))}")
+    return targets
+
+
+def combine(matched: set[int], targets: list[tuple]) -> tuple | None:
+    """Merge the targets of all matching rules; None if they disagree."""
+    division_ids = {targets[i][DIVISION] for i in matched}
+    department_ids = {targets[i][DEPARTMENT] for i in matched} - {None}
+    if len(division_ids) > 1 or len(department_ids) > 1:
+        return None
+    # Prefer a department-level target; it implies the same division
+    return max((targets[i] for i in matched), key=lambda t: t[DEPARTMENT] is not None)
+
+
+def classify_manifest(csv_path: str, matcher: RuleMatcher, targets: list[tuple], metrics: Metrics):
+    """
+    Match every manifest row against the rules, once per distinct folder.
+
+    Returns:
+        tuple: (rows, report) where rows are (location, path, *target) for matched documents
+    """
+    folder_cache: dict[str, tuple[set[int], tuple | None]] = {}
+    rule_hits = Counter()
+    unmatched = Counter()
+    conflicts: dict[str, list[int]] = {}
+    conflict_docs = Counter()
+    status = Counter()
+    rows = []
+
+    with metrics.stage("match"):
+        for _, location, path in iter_manifest(csv_path):
+            metrics.count("rows")
+            path = normalize_path(path)
+            folder, _ = split_folder(path)
+            cached = folder_cache.get(folder)
+            if cached is None:
+                matched = matcher.match([segment_key(s) for s in folder.split(SEPARATOR) if s])
+                cached = folder_cache[folder] = (matched, combine(matched, targets) if matched else None)
+                metrics.count("folders")
+            matched, target = cached
+
+            if not matched:
+                status["unmatched"] += 1
+                unmatched[folder] += 1
+                continue
+            rule_hits.update(matched)
+            if target is None:
+                status["conflict"] += 1
+                conflicts[folder] = sorted(matched)
+                conflict_docs[folder] += 1
+                continue
+            status["department" if target[DEPARTMENT] else "division_only"] += 1
+            rows.append((location.strip(), path, *target))
+
+    total = sum(status.values())
+    report = {
+        "documents": total,
+        "department_matches": status["department"],
+        "division_only_matches": status["division_only"],
+        "conflicts": status["conflict"],
+        "unmatched": status["unmatched"],
+        "coverage": round((status["department"] + status["division_only"]) / total, 4) if total else 0.0,
+        "rule_hits": {str(i): rule_hits[i] for i in range(len(targets))},
+        "unused_rules": [i for i in range(len(targets)) if not rule_hits[i]],
+        "conflict_folders": [
+            {"folder": folder, "documents": count, "rules": conflicts[folder]}
+            for folder, count in conflict_docs.most_common()
+        ],
+        "top_unmatched_folders": [
+            {"folder": folder, "documents": count} for folder, count in unmatched.most_common(REPORT_TOP)
+        ],
+    }
+    return rows, report
+
+
+def apply_classification(conn, rows: list[tuple], metrics: Metrics) -> int:
+    """Pre-fill the org fields of unclassified documents with one UPDATE; returns the number updated."""
+    with metrics.stage("update"), conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TEMP TABLE staging_classification (
+              location TEXT, path TEXT,
+              executive_director_id UUID, secretary_id UUID, division_id UUID, department_id UUID
+            ) ON COMMIT DROP
+            """
+        )
+        copy_rows(cur, "staging_classification", rows)
+        cur.execute(
+            """
+            UPDATE documents d
+            SET executive_director_id = s.executive_director_id,
+                secretary_id = s.secretary_id,
+                division_id = s.division_id,
+                department_id = s.department_id,
+                updated_at = NOW()
+            FROM staging_classification s
+            WHERE d.location = s.location AND d.path = s.path
+              -- Unclassified as the classify page defines it
+              AND d.priority IS NULL AND d.access_level IS NULL
+              AND (d.status IS NULL OR d.status = 'unclassified')
+              AND (d.division_id IS DISTINCT FROM s.division_id
+                   OR d.department_id IS DISTINCT FROM s.department_id)
+            """
+        )
+        metrics.count("updated", cur.rowcount)
+        return cur.rowcount
+
+
+def print_report(report: dict, rules: list[dict]):
+    print("=" * 60)
+    print("AUTO-CLASSIFICATION REPORT")
+    print("=" * 60)
+    print(f"Documents:             {report['documents']}")
+    print(f"Department matches:    {report['department_matches']}")
+    print(f"Division-only matches: {report['division_only_matches']}")
+    print(f"Conflicts:             {report['conflicts']}")
+    print(f"Unmatched:             {report['unmatched']}")
+    print(f"Coverage:              {report['coverage']:.1%}")
+
+    for i in report["unused_rules"]:
+        print(f"   [WARNING] Rule {i} ({rules[i]['match']}) matched nothing")
+    for entry in report["conflict_folders"][:REPORT_TOP]:
+        names = ", ".join(rules[i].get("department") or rules[i]["division"] for i in entry["rules"])
+        print(f"   [WARNING] Conflict in {entry['folder'] or '(root)'} ({entry['documents']} docs): {names}")
+    if report["top_unmatched_folders"]:
+        print("\nLargest unmatched folders:")
+        for entry in report["top_unmatched_folders"][:10]:
+            print(f"   {entry['documents']:>6}  {entry['folder'] or '(root)'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify documents from their folder paths")
+    parser.add_argument("--rules", required=True, help="Rules JSON (see classification_rules.example.json)")
+    parser.add_argument("--csv", default=CSV_FILE, help="Crawler manifest")
+    parser.add_argument("--report", default=REPORT_FILE, help="Where to write the JSON coverage/conflict report")
+    parser.add_argument("--report-only", action="store_true", help="Match and report without updating documents")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    csv_path = os.path.join(script_dir, args.csv)
+    if not os.path.exists(csv_path):
+        print(f"[ERROR] CSV file not found: {csv_path}")
+        return
+
+    rules = load_rules(args.rules)
+    matcher = RuleMatcher([rule["match"] for rule in rules])
+    metrics = Metrics("auto_classify", args.metrics)
+    print(f"[INFO] Compiled {len(rules)} rules")
+
+    conn = connect()
+    try:
+        with conn.cursor() as cur:
+            targets = resolve_targets(rules, *load_org_targets(cur))
+
+        with profiled(args.profile, os.path.join(script_dir, "auto_classify.prof")):
+            rows, report = classify_manifest(csv_path, matcher, targets, metrics)
+            if not args.report_only:
+                report["updated"] = apply_classification(conn, rows, metrics)
+                print(f"[INFO] Pre-filled org fields on {report['updated']} unclassified documents")
+    finally:
+        conn.close()
+
+    with open(os.path.join(script_dir, args.report), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print_report(report, rules)
+    print(f"\n[SUCCESS] Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Ingest Benchmark Suite
+Times the temp/ ingest tools against synthetic drives so changes can be compared.
+
+For each requested size a synthetic folder tree (configurable depth and fan-out)
+is generated as a CSV manifest and, unless --manifest-only is given, as real
+empty files on local disk. Then each stage is timed and its peak Python memory
+measured with tracemalloc:
+
+  crawl               crawl_google_drive.crawl_directory
+  extract_folders     extract_folders.parse_csv_and_extract_folders
+  import_sql          import_via_sql.generate_import_sql
+  path_update_sql     update_document_paths.generate_path_update_sql
+  prune_local         delete_empty_local_folders.prune_folder (on the synthetic tree)
+
+Results are written as JSON; pass --compare with an earlier results file to
+print the change per stage.
+
+Example:
+  python benchmark_ingest.py --size 10k --size 100k
+  python benchmark_ingest.py --size 1m --manifest-only --output bench_1m.json
+  python benchmark_ingest.py --size 10k --compare bench_results.json
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from crawl_google_drive import LOCATION_UUID, crawl_directory
+from delete_empty_local_folders import DEFAULT_IGNORE_NAMES, prune_folder
+from drive_paths import SEPARATOR
+from extract_folders import parse_csv_and_extract_folders
+from import_via_sql import generate_import_sql
+from update_document_paths import generate_path_update_sql
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_OUTPUT = "bench_results.json"
+FILE_EXTENSIONS = ["pdf", "docx", "doc", "txt", "jpg", "png", "xlsx", "mp4", "zip"]
+# A few awkward names so quoting, Unicode and LIKE escaping are exercised too
+FOLDER_NAMES = ["Lectures", "Issue's", "Policy Letters", "Bulletins_1960", "Café", "100% Files"]
+
+
+def synthetic_paths(file_count: int, depth: int, fanout: int, seed: int) -> list[str]:
+    """
+    Generate canonical relative paths for file_count files.
+    Each file lands in a random folder 0..depth levels deep, each level choosing
+    one of fanout children, so the tree has at most fanout**depth leaf folders.
+    """
+    rng = random.Random(seed)
+    paths = []
+    for i in range(file_count):
+        level = rng.randint(0, depth)
+        folders = [
+            f"{FOLDER_NAMES[n % len(FOLDER_NAMES)]} {n}"
+            for n in (rng.randrange(fanout) for _ in range(level))
+        ]
+        ext = FILE_EXTENSIONS[i % len(FILE_EXTENSIONS)]
+        paths.append(SEPARATOR.join(folders + [f"document {i:07d}.{ext}"]))
+    return paths
+
+
+def write_manifest(paths: list[str], csv_path: str):
+    """Write paths as a crawler-format manifest."""
+    with open(csv_path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Document Name", "Location", "Path"])
+        for path in paths:
+            writer.writerow([path.rpartition(SEPARATOR)[2], LOCATION_UUID, path])
+
+
+def build_tree(root: str, paths: list[str], empty_dirs: int, seed: int):
+    """Create every path as an empty file under root, plus some empty folder chains to prune."""
+    made = set()
+    for path in paths:
+        folder, _, name = path.rpartition(SEPARATOR)
+        target = os.path.join(root, *folder.split(SEPARATOR)) if folder else root
+        if target not in made:
+            os.makedirs(target, exist_ok=True)
+            made.add(target)
+        open(os.path.join(target, name), "wb").close()
+
+    rng = random.Random(seed)
+    folders = sorted(made)
+    for i in range(empty_dirs):
+        base = rng.choice(folders) if folders else root
+        os.makedirs(os.path.join(base, f"empty {i}", "nested"), exist_ok=True)
+
+
+def run_stage(name: str, func, track_memory: bool) -> dict:
+    """Run func once with its console output silenced; return timing and peak memory."""
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+
+        peak = None
+        if track_memory:
+            # Separate pass: tracemalloc slows allocation-heavy code a lot
+            tracemalloc.start()
+            try:
+                func()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+    print(f"   {name:<18} {seconds:9.3f}s" + (f"   peak {peak / 1_048_576:8.1f} MiB" if peak is not None else ""))
+    return {"stage": name, "seconds": round(seconds, 4), "peak_memory_bytes": peak}
+
+
+def benchmark_size(label: str, file_count: int, args, workdir: str) -> list[dict]:
+    """Generate one synthetic drive and time every stage against it."""
+    print(f"\n[INFO] {label}: {file_count} files, depth {args.depth}, fan-out {args.fanout}")
+    size_dir = os.path.join(workdir, label)
+    os.makedirs(size_dir, exist_ok=True)
+
+    paths = synthetic_paths(file_count, args.depth, args.fanout, args.seed)
+    manifest = os.path.join(size_dir, "manifest.csv")
+    write_manifest(paths, manifest)
+    sql_out = os.path.join(size_dir, "out.sql")
+
+    stages = []
+    if not args.manifest_only:
+        drive_root = os.path.join(size_dir, "drive")
+        print("[INFO] Building synthetic tree on disk...")
+        build_tree(drive_root, paths, args.empty_dirs, args.seed)
+        stages.append(("crawl", lambda: crawl_directory(drive_root)))
+
+    stages += [
+        ("extract_folders", lambda: parse_csv_and_extract_folders(manifest)),
+        ("import_sql", lambda: generate_import_sql(manifest, sql_out)),
+        ("path_update_sql", lambda: generate_path_update_sql(manifest, sql_out)),
+    ]
+
+    if not args.manifest_only:
+        # Dry run, so the timing and memory passes both walk the same tree
+        stages.append(("prune_local", lambda: prune_folder(drive_root, True, DEFAULT_IGNORE_NAMES)))
+
+    results = []
+    for name, func in stages:
+        result = run_stage(name, func, not args.no_memory)
+        result.update({"size": label, "files": file_count})
+        results.append(result)
+    return results
+
+
+def compare(results: list[dict], baseline_path: str):
+    """Print the relative change of every stage against an earlier results file."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["size"], r["stage"]): r for r in json.load(f)["results"]}
+
+    print(f"\n[INFO] Compared with {baseline_path}")
+    for r in results:
+        old = baseline.get((r["size"], r["stage"]))
+        if not old or not old["seconds"]:
+            continue
+        change = (r["seconds"] - old["seconds"]) / old["seconds"] * 100
+        flag = "  <-- slower" if change > 10 else ""
+        print(f"   {r['size']:<5} {r['stage']:<18} {old['seconds']:9.3f}s -> {r['seconds']:9.3f}s ({change:+6.1f}%){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ingest scripts on synthetic drives")
+    parser.add_argument("--size", action="append", choices=sorted(SIZES), help="Drive size to test (repeatable, default 10k)")
+    parser.add_argument("--files", type=int, help="Custom file count (overrides --size)")
+    parser.add_argument("--depth", type=int, default=6, help="Maximum folder depth")
+    parser.add_argument("--fanout", type=int, default=8, help="Subfolders per folder")
+    parser.add_argument("--empty-dirs", type=int, default=200, help="Empty folder chains added for the prune stage")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible trees")
+    parser.add_argument("--manifest-only", action="store_true", help="Skip on-disk stages (crawl, prune)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass")
+    parser.add_argument("--workdir", help="Where to build synthetic drives (default: a temp dir, removed afterwards)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--compare", help="Earlier JSON results file to compare against")
+    args = parser.parse_args()
+
+    if args.files:
+        sizes = [(str(args.files), args.files)]
+    else:
+        sizes = [(label, SIZES[label]) for label in (args.size or ["10k"])]
+
+    print("=" * 60)
+    print("  Ingest Benchmark Suite")
+    print("=" * 60)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="ingest_bench_")
+    results = []
+    try:
+        for label, file_count in sizes:
+            results += benchmark_size(label, file_count, args, workdir)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": {
+            "depth": args.depth,
+            "fanout": args.fanout,
+            "empty_dirs": args.empty_dirs,
+            "seed": args.seed,
+            "manifest_only": args.manifest_only,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[SUCCESS] Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
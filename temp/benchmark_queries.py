@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Query Plan and Latency Benchmark
+Checks that the classify page's queries actually use the indexes and views
+added by the migrations, on synthetic data at several sizes.
+
+For each size a fresh database is created, every scripts/*.sql migration is
+applied in file order (on top of a small shim for the Supabase-only auth
+schema and roles), and a synthetic folder tree and document set is seeded
+(same generator as benchmark_ingest.py). Then each representative query is
+run --runs times for p50/p95 latency and once under
+EXPLAIN (ANALYZE, BUFFERS) to capture its plan, the indexes it used and any
+sequential scans of documents.
+
+Postgres comes from either:
+  - --database-url: an existing server; a bench_<size> database is created
+    and dropped on it
+  - --temp-cluster: a throwaway cluster started with initdb/pg_ctl (from PATH
+    or --pg-bin) and removed afterwards
+
+Results are written as JSON; pass --compare with an earlier results file to
+flag queries that got slower or stopped using an index.
+
+Install dependency:
+  pip install psycopg2-binary
+
+Example:
+  python benchmark_queries.py --temp-cluster --size 10k --size 100k
+  python benchmark_queries.py --database-url postgresql://postgres@localhost/postgres --size 1m
+  python benchmark_queries.py --temp-cluster --compare query_bench.json
+"""
+
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+from psycopg2.extensions import make_dsn
+
+from benchmark_ingest import SIZES, synthetic_paths
+from crawl_google_drive import LOCATION_UUID
+from db_connection import copy_rows
+from drive_paths import SEPARATOR
+from import_via_sql import get_file_type
+
+DEFAULT_OUTPUT = "query_bench.json"
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+PAGE_SIZE = 50
+CLASSIFIED_SHARE = 0.3
+PRIORITIES = ["red", "green", "yellow"]
+ACCESS_LEVELS = ["public", "internal", "restricted"]
+SLOWER_THRESHOLD = 20
+
+# Stand-ins for what Supabase provides, so the migrations apply on plain Postgres
+SUPABASE_SHIM = """
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+    CREATE ROLE authenticated NOLOGIN;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+    CREATE ROLE anon NOLOGIN;
+  END IF;
+END $$;
+CREATE SCHEMA IF NOT EXISTS auth;
+CREATE TABLE IF NOT EXISTS auth.users (id UUID PRIMARY KEY);
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS UUID LANGUAGE sql STABLE AS 'SELECT NULL::uuid';
+"""
+
+# The classify page's queries (components/classification-interface.tsx) in SQL form
+QUERIES = {
+    "unclassified_page": """
+        SELECT * FROM documents
+        WHERE priority IS NULL AND access_level IS NULL
+        ORDER BY created_at DESC LIMIT %(limit)s
+    """,
+    "unclassified_count": """
+        SELECT COUNT(*) FROM documents WHERE priority IS NULL AND access_level IS NULL
+    """,
+    "status_page": """
+        SELECT * FROM documents
+        WHERE status = 'unclassified'
+        ORDER BY created_at LIMIT %(limit)s
+    """,
+    "classified_page": """
+        SELECT d.*, v.name AS division_name, dp.name AS department_name
+        FROM documents d
+        LEFT JOIN divisions v ON v.id = d.division_id
+        LEFT JOIN departments dp ON dp.id = d.department_id
+        WHERE d.priority IS NOT NULL OR d.access_level IS NOT NULL
+        ORDER BY d.created_at DESC LIMIT %(limit)s
+    """,
+    "folder_filter_page": """
+        SELECT * FROM documents
+        WHERE folder_id = ANY(%(subtree_ids)s::uuid[])
+          AND priority IS NULL AND access_level IS NULL
+        ORDER BY created_at DESC LIMIT %(limit)s
+    """,
+    "folder_subtree_prefix": """
+        SELECT d.* FROM documents d
+        JOIN folders f ON f.id = d.folder_id
+        WHERE f.full_path = %(folder_path)s OR f.full_path LIKE %(folder_prefix)s
+        ORDER BY d.created_at DESC LIMIT %(limit)s
+    """,
+    "folder_subtree_ltree": """
+        SELECT d.* FROM documents d
+        JOIN folders f ON f.id = d.folder_id
+        WHERE f.path_ltree <@ %(folder_ltree)s::ltree
+        ORDER BY d.created_at DESC LIMIT %(limit)s
+    """,
+    "title_search": """
+        SELECT * FROM documents
+        WHERE title ILIKE %(title_pattern)s
+        ORDER BY created_at DESC LIMIT %(limit)s
+    """,
+    "title_search_count": """
+        SELECT COUNT(*) FROM documents WHERE title ILIKE %(title_pattern)s
+    """,
+    "folder_counts": """
+        SELECT f.id, f.name, f.full_path, f.level, f.parent_id, c.document_count
+        FROM folders f
+        LEFT JOIN folder_document_counts c ON c.folder_id = f.id
+        ORDER BY f.full_path LIMIT 10000
+    """,
+    "unassigned_count": """
+        SELECT COUNT(*) FROM documents WHERE folder_id IS NULL
+    """,
+    # One keyset page of temp/export_documents.py
+    "export_page": """
+        SELECT d.id, d.title, d.path, d.created_at FROM documents d
+        WHERE (d.priority IS NOT NULL OR d.access_level IS NOT NULL OR d.status = 'classified')
+          AND (d.created_at, d.id) > (%(export_after)s, %(document_id)s)
+        ORDER BY d.created_at, d.id LIMIT 5000
+    """,
+    # Includes the folder_document_counts refresh trigger; rolled back afterwards
+    "classify_one": """
+        UPDATE documents SET priority = 'red', status = 'classified', classified_at = NOW()
+        WHERE id = %(document_id)s
+    """,
+}
+
+
+@contextmanager
+def temp_cluster(pg_bin: str | None):
+    """Start a throwaway Postgres cluster on a free port; yield its maintenance URL."""
+    def tool(name):
+        path = os.path.join(pg_bin, name) if pg_bin else shutil.which(name)
+        if not path or not os.path.exists(path):
+            raise RuntimeError(f"{name} not found (put the Postgres bin directory on PATH or pass --pg-bin)")
+        return path
+
+    workdir = tempfile.mkdtemp(prefix="query_bench_")
+    data_dir = os.path.join(workdir, "data")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    subprocess.run([tool("initdb"), "-D", data_dir, "-U", "postgres", "-A", "trust", "--no-sync"],
+                   check=True, stdout=subprocess.DEVNULL)
+    options = f"-p {port} -k {workdir} -c listen_addresses='' -c fsync=off -c synchronous_commit=off"
+    subprocess.run([tool("pg_ctl"), "-D", data_dir, "-o", options, "-l", os.path.join(workdir, "server.log"),
+                    "-w", "start"], check=True, stdout=subprocess.DEVNULL)
+    try:
+        yield make_dsn(user="postgres", dbname="postgres", host=workdir, port=port)
+    finally:
+        subprocess.run([tool("pg_ctl"), "-D", data_dir, "-m", "fast", "-w", "stop"], stdout=subprocess.DEVNULL)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+@contextmanager
+def scratch_database(admin_url: str, name: str, keep: bool):
+    """Create an empty database (replacing any earlier one) and yield a connection to it."""
+    admin = psycopg2.connect(admin_url)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f'DROP DATABASE IF EXISTS "{name}"')
+        cur.execute(f'CREATE DATABASE "{name}"')
+    conn = psycopg2.connect(make_dsn(admin_url, dbname=name))
+    conn.autocommit = True
+    try:
+        yield conn
+    finally:
+        conn.close()
+        if not keep:
+            with admin.cursor() as cur:
+                cur.execute(f'DROP DATABASE IF EXISTS "{name}"')
+        admin.close()
+
+
+def apply_migrations(conn) -> list[dict]:
+    """Apply the shim and every scripts/*.sql in order; return the ones that failed."""
+    failures = []
+    with conn.cursor() as cur:
+        cur.execute(SUPABASE_SHIM)
+        for path in sorted(glob.glob(os.path.join(SCRIPTS_DIR, "*.sql"))):
+            with open(path, "r", encoding="utf-8") as f:
+                sql = f.read()
+            try:
+                cur.execute(sql)
+            except psycopg2.Error as e:
+                # Files with their own BEGIN leave an aborted transaction behind
+                cur.execute("ROLLBACK")
+                failures.append({"migration": os.path.basename(path), "error": str(e).strip()})
+                print(f"   [WARNING] {os.path.basename(path)}: {str(e).strip().splitlines()[0]}")
+    return failures
+
+
+def seed(conn, file_count: int, args) -> dict:
+    """
+    Seed folders and documents from the synthetic drive generator.
+    Returns the query parameters picked from the seeded data.
+    """
+    rng = random.Random(args.seed)
+    paths = synthetic_paths(file_count, args.depth, args.fanout, args.seed)
+
+    folder_ids = {}
+    for path in paths:
+        parts = path.split(SEPARATOR)[:-1]
+        for level in range(len(parts)):
+            folder_ids.setdefault(SEPARATOR.join(parts[:level + 1]), uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, division_id FROM departments")
+        departments = cur.fetchall()
+
+        copy_rows(cur, "folders (id, name, parent_id, full_path, level)", (
+            (folder_id, folder.rpartition(SEPARATOR)[2], folder_ids.get(folder.rpartition(SEPARATOR)[0]),
+             folder, folder.count(SEPARATOR))
+            for folder, folder_id in sorted(folder_ids.items(), key=lambda item: item[0].count(SEPARATOR))
+        ))
+        # 021's own backfill passes names straight to text2ltree, which rejects spaces and punctuation
+        cur.execute(
+            "UPDATE folders SET path_ltree = text2ltree(regexp_replace(replace(full_path, '/', '.'), '[^A-Za-z0-9_.]', '_', 'g'))"
+        )
+
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        def documents():
+            for i, path in enumerate(paths):
+                folder, _, name = path.rpartition(SEPARATOR)
+                created_at = base + timedelta(seconds=rng.randrange(file_count * 60))
+                if departments and rng.random() < CLASSIFIED_SHARE:
+                    department_id, division_id = rng.choice(departments)
+                    yield (uuid.UUID(int=rng.getrandbits(128), version=4), name, get_file_type(name), "classified",
+                           LOCATION_UUID, path, folder_ids.get(folder), rng.choice(PRIORITIES),
+                           rng.choice(ACCESS_LEVELS), division_id, department_id, created_at)
+                else:
+                    yield (uuid.UUID(int=rng.getrandbits(128), version=4), name, get_file_type(name), "unclassified",
+                           LOCATION_UUID, path, folder_ids.get(folder), None, None, None, None, created_at)
+
+        # Statement triggers (folder count refresh) would fire once per COPY batch
+        cur.execute("ALTER TABLE documents DISABLE TRIGGER USER")
+        copy_rows(cur, "documents (id, title, file_type, status, location, path, folder_id, priority, "
+                       "access_level, division_id, department_id, created_at)", documents(), args.copy_batch)
+        cur.execute("ALTER TABLE documents ENABLE TRIGGER USER")
+        cur.execute("REFRESH MATERIALIZED VIEW folder_document_counts")
+        cur.execute("VACUUM ANALYZE")
+
+        # A top-level folder for the subtree queries
+        top = sorted(f for f in folder_ids if SEPARATOR not in f)[0] if folder_ids else ""
+        cur.execute("SELECT path_ltree::text FROM folders WHERE full_path = %s", (top,))
+        row = cur.fetchone()
+        subtree = [str(folder_ids[f]) for f in folder_ids if f == top or f.startswith(top + SEPARATOR)]
+
+    return {
+        "limit": PAGE_SIZE,
+        "subtree_ids": subtree,
+        "folder_path": top,
+        "folder_prefix": top.replace("%", "\\%").replace("_", "\\_") + SEPARATOR + "%",
+        "folder_ltree": row[0] if row else "",
+        "title_pattern": f"%{rng.randrange(file_count):07d}%",
+        "document_id": None,
+        "export_after": base + timedelta(seconds=file_count * 30),
+    }
+
+
+def plan_summary(plan: dict) -> tuple[list[str], list[str]]:
+    """Return (index names used, relations read by sequential scan) from an EXPLAIN JSON plan."""
+    indexes, seq_scans = set(), set()
+    stack = [plan["Plan"]]
+    while stack:
+        node = stack.pop()
+        if node.get("Index Name"):
+            indexes.add(node["Index Name"])
+        if node.get("Node Type") == "Seq Scan":
+            seq_scans.add(node.get("Relation Name"))
+        stack.extend(node.get("Plans", []))
+    return sorted(indexes), sorted(seq_scans)
+
+
+def run_query(conn, name: str, sql: str, params: dict, runs: int, warmup: int) -> dict:
+    """Time a query runs times after warmup runs, then EXPLAIN (ANALYZE, BUFFERS) it once."""
+    writes = sql.lstrip().upper().startswith(("UPDATE", "INSERT", "DELETE"))
+    timings = []
+    with conn.cursor() as cur:
+        for i in range(warmup + runs):
+            if writes:
+                cur.execute("BEGIN")
+            start = time.perf_counter()
+            cur.execute(sql, params)
+            if cur.description:
+                cur.fetchall()
+            elapsed = time.perf_counter() - start
+            if writes:
+                cur.execute("ROLLBACK")
+            if i >= warmup:
+                timings.append(elapsed * 1000)
+
+        if writes:
+            cur.execute("BEGIN")
+        cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+        plan = cur.fetchone()[0][0]
+        if writes:
+            cur.execute("ROLLBACK")
+
+    timings.sort()
+    indexes, seq_scans = plan_summary(plan)
+    result = {
+        "query": name,
+        "runs": runs,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "indexes": indexes,
+        "seq_scans": seq_scans,
+        "plan": plan,
+    }
+    flag = "   <-- seq scan on documents" if "documents" in seq_scans else ""
+    print(f"   {name:<24} p50 {result['p50_ms']:9.2f} ms   p95 {result['p95_ms']:9.2f} ms{flag}")
+    return result
+
+
+def benchmark_size(admin_url: str, label: str, file_count: int, args) -> dict:
+    """Build one database at file_count documents and run every query against it."""
+    print(f"\n[INFO] {label}: {file_count} documents")
+    with scratch_database(admin_url, f"bench_{label}", args.keep) as conn:
+        failures = apply_migrations(conn)
+
+        start = time.perf_counter()
+        params = seed(conn, file_count, args)
+        seed_seconds = time.perf_counter() - start
+        print(f"[INFO] Seeded in {seed_seconds:.1f}s")
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM documents WHERE status = 'unclassified' LIMIT 1")
+            row = cur.fetchone()
+            params["document_id"] = row[0] if row else None
+
+        queries = []
+        for name, sql in QUERIES.items():
+            if args.query and name not in args.query:
+                continue
+            try:
+                queries.append(run_query(conn, name, sql, params, args.runs, args.warmup))
+            except psycopg2.Error as e:
+                with conn.cursor() as cur:
+                    cur.execute("ROLLBACK")
+                queries.append({"query": name, "error": str(e).strip()})
+                print(f"   [ERROR] {name}: {str(e).strip().splitlines()[0]}")
+
+    return {
+        "size": label,
+        "documents": file_count,
+        "migration_failures": failures,
+        "seed_seconds": round(seed_seconds, 2),
+        "queries": queries,
+    }
+
+
+def compare(results: list[dict], baseline_path: str):
+    """Print latency changes and lost indexes against an earlier results file."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {
+            (size["size"], q["query"]): q
+            for size in json.load(f)["results"]
+            for q in size["queries"]
+        }
+
+    print(f"\n[INFO] Compared with {baseline_path}")
+    for size in results:
+        for q in size["queries"]:
+            old = baseline.get((size["size"], q["query"]))
+            if "error" in q:
+                print(f"   {size['size']:<5} {q['query']:<24} <-- now fails: {q['error'].splitlines()[0]}")
+                continue
+            if not old or not old.get("p95_ms"):
+                continue
+            change = (q["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+            flag = "  <-- slower" if change > SLOWER_THRESHOLD else ""
+            lost = sorted(set(old["indexes"]) - set(q["indexes"]))
+            if lost:
+                flag += f"  <-- no longer uses {', '.join(lost)}"
+            print(f"   {size['size']:<5} {q['query']:<24} p95 {old['p95_ms']:9.2f} -> {q['p95_ms']:9.2f} ms ({change:+6.1f}%){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app's queries against the migrated schema")
+    server = parser.add_mutually_exclusive_group(required=True)
+    server.add_argument("--database-url", help="Maintenance URL of an existing Postgres server")
+    server.add_argument("--temp-cluster", action="store_true", help="Start a throwaway cluster with initdb/pg_ctl")
+    parser.add_argument("--pg-bin", help="Directory containing initdb and pg_ctl")
+    parser.add_argument("--size", action="append", choices=sorted(SIZES), help="Dataset size (repeatable, default 10k)")
+    parser.add_argument("--query", action="append", choices=sorted(QUERIES), help="Only run these queries (repeatable)")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed runs per query first")
+    parser.add_argument("--depth", type=int, default=6, help="Maximum folder depth")
+    parser.add_argument("--fanout", type=int, default=8, help="Subfolders per folder")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible data")
+    parser.add_argument("--copy-batch", type=int, default=10_000, help="Rows per COPY while seeding")
+    parser.add_argument("--keep", action="store_true", help="Keep the bench_<size> databases (with --database-url)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--compare", help="Earlier JSON results file to compare against")
+    args = parser.parse_args()
+
+    sizes = [(label, SIZES[label]) for label in (args.size or ["10k"])]
+
+    print("=" * 60)
+    print("  Query Plan and Latency Benchmark")
+    print("=" * 60)
+
+    results = []
+    with temp_cluster(args.pg_bin) if args.temp_cluster else nullcontext(args.database_url) as admin_url:
+        conn = psycopg2.connect(admin_url)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SHOW server_version")
+                server_version = cur.fetchone()[0]
+        finally:
+            conn.close()
+        for label, file_count in sizes:
+            results.append(benchmark_size(admin_url, label, file_count, args))
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "postgres": server_version,
+        "params": {
+            "depth": args.depth,
+            "fanout": args.fanout,
+            "seed": args.seed,
+            "runs": args.runs,
+            "warmup": args.warmup,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n[SUCCESS] Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
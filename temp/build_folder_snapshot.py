@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Folder Tree Snapshot Builder
+Precomputes the classify page's folder filter tree so the page reads one JSON
+file instead of fetching every folder plus folder_document_counts and
+assembling the tree on each load.
+
+The snapshot (data/folder-tree.json by default) is nested JSON:
+
+  {"version": "3f9c...", "generated_at": "...", "documents": 31221,
+   "unassigned": 120,
+   "source": {"changes": 1842},
+   "folders": [{"id": "...", "name": "chrono", "path": "chrono",
+                "count": 4, "total": 9120, "children": [...]}]}
+
+count is the folder's own documents and total the rolled-up subtree count.
+version is a hash of the tree content; /api/folder-tree serves it as the
+ETag, so browsers revalidate with a 304 until the tree actually changes.
+
+source holds folder_tree_state.changes (scripts/031), a counter bumped by
+triggers on every statement that writes folders or inserts, deletes or moves
+documents between folders, including watch_google_drive.py's subtree renames.
+/api/folder-tree reads it (one row) on each request and builds the tree from
+live queries instead while the snapshot is stale.
+
+Runs after imports are incremental: when the signature matches the previous
+snapshot nothing else is queried. Otherwise direct counts are read from the
+folder_document_counts view (kept current by scripts/023's trigger) rather
+than counted over documents, and if the folders are the same as in the
+previous snapshot only folders whose counts changed (and their ancestors)
+are updated. The file is rewritten whenever the signature changed, so the app
+stops treating it as stale. --full counts over documents and rebuilds from scratch.
+
+Install dependency:
+  pip install psycopg2-binary
+
+Usage:
+  python build_folder_snapshot.py
+  python build_folder_snapshot.py --full            # ignore the previous snapshot
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from db_connection import connect
+from ingest_metrics import Metrics, add_arguments, profiled
+
+SNAPSHOT_FILE = os.path.join("..", "data", "folder-tree.json")
+VERSION_LENGTH = 16
+
+
+def fetch_signature(cur) -> dict:
+    """Return the folder tree change counter stored as the snapshot's source."""
+    cur.execute("SELECT changes FROM folder_tree_state")
+    return {"changes": cur.fetchone()[0]}
+
+
+def fetch_tree_source(cur, exact: bool) -> tuple[list[tuple], dict, int]:
+    """
+    Return (folders, counts, unassigned): folder rows (id, name, parent_id, full_path)
+    ordered by path, direct document counts by folder id, and documents with no folder.
+    exact counts over documents; otherwise the folder_document_counts view is read.
+    """
+    cur.execute("SELECT id::text, name, parent_id::text, full_path FROM folders ORDER BY full_path")
+    folders = cur.fetchall()
+    if exact:
+        cur.execute("SELECT folder_id::text, COUNT(*) FROM documents GROUP BY folder_id")
+        counts = dict(cur.fetchall())
+        return folders, counts, counts.pop(None, 0)
+
+    cur.execute("SELECT folder_id::text, document_count FROM folder_document_counts")
+    counts = dict(cur.fetchall())
+    cur.execute("SELECT COUNT(*) FROM documents WHERE folder_id IS NULL")
+    return folders, counts, cur.fetchone()[0]
+
+
+def build_tree(folders: list[tuple], counts: dict) -> list[dict]:
+    """Nest folder rows into a tree and roll document counts up to every ancestor."""
+    nodes = {
+        folder_id: {"id": folder_id, "name": name, "path": full_path, "count": counts.get(folder_id, 0),
+                    "total": 0, "children": []}
+        for folder_id, name, _, full_path in folders
+    }
+    roots = []
+    for folder_id, _, parent_id, _ in folders:
+        parent = nodes.get(parent_id)
+        (parent["children"] if parent else roots).append(nodes[folder_id])
+
+    # Post-order so each child's total is final before it is added to its parent
+    stack = [(node, False) for node in roots]
+    while stack:
+        node, visited = stack.pop()
+        if visited:
+            node["total"] = node["count"] + sum(child["total"] for child in node["children"])
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node["children"])
+    return roots
+
+
+def index_tree(roots: list[dict]) -> tuple[dict, dict]:
+    """Return ({id: node}, {id: parent_id}) for every folder in a nested tree."""
+    nodes, parents = {}, {}
+    stack = [(node, None) for node in roots]
+    while stack:
+        node, parent_id = stack.pop()
+        nodes[node["id"]] = node
+        parents[node["id"]] = parent_id
+        stack.extend((child, node["id"]) for child in node["children"])
+    return nodes, parents
+
+
+def update_counts(roots: list[dict], folders: list[tuple], counts: dict) -> int | None:
+    """
+    Apply new direct counts to an existing tree in place, adjusting only the changed
+    folders' ancestors. Returns the number of folders changed, or None if the folder
+    structure itself differs and the tree has to be rebuilt.
+    """
+    nodes, parents = index_tree(roots)
+    if len(nodes) != len(folders):
+        return None
+    for folder_id, name, parent_id, full_path in folders:
+        node = nodes.get(folder_id)
+        if node is None or node["name"] != name or node["path"] != full_path or parents[folder_id] != parent_id:
+            return None
+
+    changed = 0
+    for folder_id, node in nodes.items():
+        delta = counts.get(folder_id, 0) - node["count"]
+        if not delta:
+            continue
+        node["count"] += delta
+        ancestor = folder_id
+        while ancestor:
+            nodes[ancestor]["total"] += delta
+            ancestor = parents[ancestor]
+        changed += 1
+    return changed
+
+
+def tree_version(roots: list[dict], unassigned: int) -> str:
+    canonical = json.dumps([roots, unassigned], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:VERSION_LENGTH]
+
+
+def load_snapshot(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_snapshot(snapshot: dict, path: str):
+    """Write the snapshot atomically so the API never serves a half-written file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the folder tree snapshot served to the classify page")
+    parser.add_argument("--output", default=SNAPSHOT_FILE, help="Snapshot path (relative to this script)")
+    parser.add_argument("--full", action="store_true",
+                        help="Count over documents and rebuild from scratch instead of updating the previous snapshot")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    output_path = os.path.normpath(os.path.join(script_dir, args.output))
+    metrics = Metrics("folder_snapshot", args.metrics)
+
+    print("=" * 60)
+    print("  Folder Tree Snapshot")
+    print("=" * 60)
+
+    previous = None if args.full else load_snapshot(output_path)
+
+    with profiled(args.profile, os.path.join(script_dir, "build_folder_snapshot.prof")):
+        with metrics.stage("fetch"):
+            conn = connect()
+            try:
+                with conn.cursor() as cur:
+                    source = fetch_signature(cur)
+                    if previous and previous.get("source") == source:
+                        print(f"[SUCCESS] Snapshot already up to date (version {previous['version']})")
+                        return
+                    folders, counts, unassigned = fetch_tree_source(cur, exact=args.full)
+            finally:
+                conn.close()
+            metrics.count("folders", len(folders))
+
+        with metrics.stage("build"):
+            changed = update_counts(previous["folders"], folders, counts) if previous else None
+            if changed is None:
+                roots = build_tree(folders, counts)
+                print(f"[INFO] Built tree from {len(folders)} folders")
+            else:
+                roots = previous["folders"]
+                print(f"[INFO] Folder structure unchanged; {changed} folder counts updated")
+            version = tree_version(roots, unassigned)
+
+        with metrics.stage("write"):
+            write_snapshot({
+                "version": version,
+                "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "documents": sum(node["total"] for node in roots) + unassigned,
+                "unassigned": unassigned,
+                "source": source,
+                "folders": roots,
+            }, output_path)
+            metrics.count("bytes", os.path.getsize(output_path))
+
+    print(f"[SUCCESS] Snapshot written: {output_path} (version {version})")
+
+
+if __name__ == "__main__":
+    main()
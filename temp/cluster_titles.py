@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Title Similarity Clustering
+Groups documents whose titles are near-identical (issue series, dated copies,
+"Copy of ...", revisions) so a reviewer can classify a whole cluster at once.
+
+Titles are normalized first: case-folded, extension dropped, copy/revision
+markers removed and every run of digits replaced by '0', so
+"HCOB 12 Mar 1961 Copy (2).pdf" and "HCOB 14 Mar 1961.pdf" share a key.
+Titles left with nothing but masked numbers ("1.jpg", "Copy (2).pdf") are
+never clustered, since such a key says nothing about the document.
+Documents with equal keys form a cluster in one hashing pass. Keys that still
+differ slightly (typos, extra words) are merged with MinHash/LSH over
+character shingles: only keys landing in a common band bucket are compared,
+and only pairs above --threshold Jaccard similarity are joined, so the whole
+stage stays roughly linear in the number of distinct keys.
+
+By default clusters never span folders (--scope folder), since the same
+file name in unrelated folders rarely means the same classification.
+
+Cluster ids and sizes are written to documents.title_cluster_id /
+title_cluster_size (scripts/029_add_title_clusters_to_documents.sql) with one
+set-based UPDATE; the classify page offers to classify the whole cluster.
+
+Install dependency:
+  pip install psycopg2-binary
+
+Usage:
+  python cluster_titles.py
+  python cluster_titles.py --scope global --threshold 0.85
+  python cluster_titles.py --no-update --output title_clusters.csv
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import hashlib
+import os
+import random
+import re
+import zlib
+from collections import Counter, defaultdict
+
+from drive_paths import normalize_path, normalize_segment, path_key, split_folder
+from ingest_metrics import Metrics, add_arguments, profiled
+from manifest_reader import iter_manifest
+
+CSV_FILE = "google_drive_documents.csv"
+SHINGLE_SIZE = 3
+NUM_HASHES = 32
+BANDS = 8
+THRESHOLD = 0.8
+MIN_CLUSTER_SIZE = 2
+REPORT_TOP = 10
+
+EXTENSION = re.compile(r"\.[a-z0-9]{1,5}$")
+COPY_MARKERS = re.compile(
+    r"^(?:copy of\s+)+|\bcopy\b|\(\s*\d+\s*\)|\b(?:rev(?:ision)?|ver(?:sion)?|v)\s*\d+\b|\b(?:final|draft|new|old)\b"
+)
+DIGITS = re.compile(r"\d+")
+# A word character, so the mask survives PUNCTUATION
+DIGIT_MASK = "0"
+PUNCTUATION = re.compile(r"[\W_]+")
+
+
+def normalize_title(title: str) -> str:
+    """Return the similarity key of a title: case-folded, numbers masked, markers dropped."""
+    key = EXTENSION.sub("", normalize_segment(title).casefold())
+    # Underscores separate words in file names ("invoice_final"), but \b treats them as letters
+    key = COPY_MARKERS.sub(" ", key.replace("_", " "))
+    key = DIGITS.sub(DIGIT_MASK, key)
+    return " ".join(PUNCTUATION.sub(" ", key).split())
+
+
+def shingles(key: str) -> set[int]:
+    padded = f" {key} "
+    return {zlib.crc32(padded[i:i + SHINGLE_SIZE].encode("utf-8")) for i in range(max(1, len(padded) - SHINGLE_SIZE + 1))}
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        root = self.parent.setdefault(x, x)
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while x != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # Smaller key as root keeps cluster ids stable between runs
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def merge_similar_keys(keys: list[tuple[str, str]], threshold: float, seed: int, metrics: Metrics) -> UnionFind:
+    """
+    Union keys (scope, normalized title) whose titles are near-identical, using
+    MinHash signatures bucketed by LSH bands within each scope.
+    """
+    rng = random.Random(seed)
+    # XOR with a random mask per hash function: cheap, and map() keeps the min loop in C
+    masks = [rng.getrandbits(32) for _ in range(NUM_HASHES)]
+    rows = NUM_HASHES // BANDS
+    uf = UnionFind()
+    shingle_sets = {}
+    buckets = defaultdict(list)
+
+    with metrics.stage("minhash"):
+        for key in keys:
+            uf.find(key)
+            s = shingle_sets[key] = shingles(key[1])
+            signature = [min(map(mask.__xor__, s)) for mask in masks]
+            for band in range(BANDS):
+                buckets[(key[0], band, tuple(signature[band * rows:(band + 1) * rows]))].append(key)
+            metrics.count("keys")
+
+    with metrics.stage("compare"):
+        for candidates in buckets.values():
+            if len(candidates) < 2:
+                continue
+            # Compare each key with one representative per group found in this bucket so far
+            representatives = [candidates[0]]
+            for key in candidates[1:]:
+                a = shingle_sets[key]
+                for rep in representatives:
+                    if uf.find(rep) == uf.find(key):
+                        break
+                    b = shingle_sets[rep]
+                    metrics.count("comparisons")
+                    if len(a & b) / len(a | b) >= threshold:
+                        uf.union(rep, key)
+                        metrics.count("merges")
+                        break
+                else:
+                    representatives.append(key)
+    return uf
+
+
+def cluster_manifest(csv_path: str, scope: str, threshold: float, seed: int, metrics: Metrics):
+    """
+    Cluster every manifest row by title.
+
+    Returns:
+        list: (location, path, title, cluster_id, cluster_size) for documents in clusters
+              of at least MIN_CLUSTER_SIZE
+    """
+    documents = []
+    key_counts = Counter()
+    with metrics.stage("normalize"):
+        for title, location, path in iter_manifest(csv_path):
+            metrics.count("rows")
+            path = normalize_path(path)
+            title = normalize_segment(title)
+            title_key = normalize_title(title)
+            # Only numbers or markers ("1.jpg", "Copy (2).pdf"): nothing to cluster on
+            if not title_key.strip(DIGIT_MASK + " "):
+                metrics.count("empty_keys")
+                continue
+            folder, _ = split_folder(path)
+            key = (path_key(folder) if scope == "folder" else "", title_key)
+            documents.append((location.strip(), path, title, key))
+            key_counts[key] += 1
+
+    print(f"[INFO] {len(documents)} documents, {len(key_counts)} distinct title keys")
+    uf = merge_similar_keys(list(key_counts), threshold, seed, metrics)
+
+    sizes = Counter()
+    for key, count in key_counts.items():
+        sizes[uf.find(key)] += count
+
+    clustered = []
+    for location, path, title, key in documents:
+        root = uf.find(key)
+        if sizes[root] < MIN_CLUSTER_SIZE:
+            continue
+        cluster_id = "t" + hashlib.sha1("\x00".join(root).encode("utf-8")).hexdigest()[:12]
+        clustered.append((location, path, title, cluster_id, sizes[root]))
+    return clustered
+
+
+def update_documents(conn, clustered: list[tuple], metrics: Metrics):
+    """Replace every document's cluster assignment with one UPDATE."""
+    from db_connection import copy_rows
+
+    with metrics.stage("update"), conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TEMP TABLE staging_clusters (
+              location TEXT, path TEXT, title_cluster_id TEXT, title_cluster_size INTEGER
+            ) ON COMMIT DROP
+            """
+        )
+        copy_rows(cur, "staging_clusters", ((loc, path, cid, size) for loc, path, _, cid, size in clustered))
+        cur.execute("CREATE INDEX ON staging_clusters (location, path)")
+        cur.execute(
+            """
+            UPDATE documents d
+            SET title_cluster_id = s.title_cluster_id,
+                title_cluster_size = s.title_cluster_size
+            FROM documents d2
+            LEFT JOIN staging_clusters s ON s.location = d2.location AND s.path = d2.path
+            WHERE d.id = d2.id
+              AND (d.title_cluster_id IS NOT NULL OR s.title_cluster_id IS NOT NULL)
+              AND (d.title_cluster_id IS DISTINCT FROM s.title_cluster_id
+                   OR d.title_cluster_size IS DISTINCT FROM s.title_cluster_size)
+            """
+        )
+        metrics.count("updated", cur.rowcount)
+        print(f"[INFO] Updated {cur.rowcount} documents")
+
+
+def write_clusters_csv(clustered: list[tuple], output_path: str):
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Cluster", "Cluster Size", "Document Name", "Location", "Path"])
+        for location, path, title, cluster_id, size in sorted(clustered, key=lambda r: (-r[4], r[3], r[1])):
+            writer.writerow([cluster_id, size, title, location, path])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster near-identical document titles for batch classification")
+    parser.add_argument("--csv", default=CSV_FILE, help="Crawler manifest")
+    parser.add_argument("--scope", choices=["folder", "global"], default="folder", help="Whether clusters may span folders")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Jaccard similarity needed to merge title keys")
+    parser.add_argument("--seed", type=int, default=42, help="MinHash seed (fixed so cluster ids are stable)")
+    parser.add_argument("--output", help="Also write the clusters to this CSV for review")
+    parser.add_argument("--no-update", action="store_true", help="Do not write cluster ids to the database")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    csv_path = os.path.join(script_dir, args.csv)
+    if not os.path.exists(csv_path):
+        print(f"[ERROR] CSV file not found: {csv_path}")
+        return
+
+    metrics = Metrics("cluster_titles", args.metrics)
+    with profiled(args.profile, os.path.join(script_dir, "cluster_titles.prof")):
+        clustered = cluster_manifest(csv_path, args.scope, args.threshold, args.seed, metrics)
+
+        sizes = Counter({cluster_id: size for _, _, _, cluster_id, size in clustered})
+        print(f"[SUCCESS] {len(clustered)} documents in {len(sizes)} clusters")
+        for cluster_id, size in sizes.most_common(REPORT_TOP):
+            example = next(title for _, _, title, cid, _ in clustered if cid == cluster_id)
+            print(f"   {size:>6}  {cluster_id}  e.g. {example}")
+
+        if args.output:
+            write_clusters_csv(clustered, os.path.join(script_dir, args.output))
+            print(f"[INFO] Clusters written to {args.output}")
+
+        if not args.no_update:
+            from db_connection import connect
+            conn = connect()
+            try:
+                update_documents(conn, clustered, metrics)
+            finally:
+                conn.close()
+
+
+if __name__ == "__main__":
+    main()
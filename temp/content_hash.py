@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Content Hash Index
+Shared helpers for the content-addressed caches (extracted text, thumbnails).
+
+Files are identified by the SHA-256 of their contents. Hashing reads the whole
+file, so each cache keeps an index of "location|path" -> {size, mtime_ns, hash}
+and only re-hashes files whose size or modification time changed.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_file(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(cache_dir: str, content_hash: str, suffix: str) -> str:
+    """Return the sharded cache file for a hash: <cache_dir>/ab/abcdef....<suffix>."""
+    return os.path.join(cache_dir, content_hash[:2], content_hash + suffix)
+
+
+def index_key(location: str, path: str) -> str:
+    return f"{location}|{path}"
+
+
+def is_unchanged(entry: dict | None, st: os.stat_result) -> bool:
+    """True if an index entry still matches the file's size and mtime."""
+    return bool(entry) and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+
+
+def load_index(index_path: str) -> dict:
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_index(index: dict, index_path: str):
+    """Write the index atomically so an interrupted run never leaves it truncated."""
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp, index_path)
@@ -2,28 +2,68 @@
 """
 Google Drive Directory Crawler
 Crawls all directories and subdirectories to create a CSV for bulk document import.
+
+By default one SOURCE_DIRECTORY is crawled for LOCATION_UUID. To crawl several
+storage locations concurrently into one combined manifest, either pass a JSON
+config of (root, location id) pairs:
+
+  python crawl_google_drive.py --config crawl_locations.json
+
+  [{"name": "Google Drive", "root": "G:\\My Drive\\scientology\\LRH-site",
+    "location_id": "ea3bd0c5-b7cf-42be-9dfa-7002d75fc8cd"}, ...]
+
+or read them from the locations table (rows with root_path set, see
+scripts/026_add_root_path_to_locations.sql):
+
+  python crawl_google_drive.py --from-db
+
+Paths in the combined manifest stay relative to each location's root, and
+folders.full_path has no location dimension, so the same relative folder in
+two locations would become one folder row. Folder paths shared by several
+locations are reported after the crawl; build folders per location with
+extract_folders.py --location.
+
+With --archives, the files inside ZIP/RAR archives are listed too (index only,
+nothing is extracted) as rows with virtual 'archive.zip!/inner/path' paths;
+see archive_index.py.
 """
 
+import argparse
+import json
 import os
 import csv
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from archive_index import MAX_ARCHIVE_MB, index_archives
+from drive_paths import is_archive_member, normalize_path, normalize_segment, path_key, split_folder
+from ingest_metrics import Metrics, add_arguments, profiled
+
 # Configuration
 SOURCE_DIRECTORY = r"G:\My Drive\scientology\LRH-site"
 OUTPUT_CSV = "google_drive_documents.csv"
 LOCATION_UUID = "ea3bd0c5-b7cf-42be-9dfa-7002d75fc8cd"  # Google Drive location UUID
+STATS_SUFFIX = ".stats.json"
 
-def crawl_directory(root_path: str) -> list[dict]:
+def crawl_directory(root_path: str, metrics: Metrics | None = None,
+                    location: str = LOCATION_UUID, archive_max_mb: int | None = None,
+                    archive_workers: int | None = None) -> list[dict]:
     """
     Crawl directory and collect all files with their metadata.
     
     Args:
         root_path: Root directory to start crawling from
+        metrics: Instrumentation to report progress to (a live-printing one by default)
+        location: Location id written on every document
+        archive_max_mb: If set, also list the files inside ZIP/RAR archives up to this size
+        archive_workers: Archives listed at once (default: ThreadPoolExecutor's default)
         
     Returns:
         List of dictionaries containing document information
     """
     documents = []
+    metrics = metrics or Metrics("crawl")
     
     # Check if directory exists
     if not os.path.exists(root_path):
@@ -37,43 +77,151 @@ def crawl_directory(root_path: str) -> list[dict]:
     dir_count = 0
     
     # Walk through all directories and subdirectories
-    for root, dirs, files in os.walk(root_path):
-        dir_count += len(dirs)
-        
-        for filename in files:
-            # Full path to the file
-            full_path = os.path.join(root, filename)
-            
-            # Convert to relative path from the root directory
-            relative_path = os.path.relpath(full_path, root_path)
-            
-            # Add document to list
-            documents.append({
-                'Document Name': filename,
-                'Location': LOCATION_UUID,
-                'Path': relative_path
-            })
+    with metrics.stage("walk"):
+        for root, dirs, files in os.walk(root_path):
+            dir_count += len(dirs)
+            metrics.count("dirs", len(dirs))
             
-            file_count += 1
-            
-            # Progress indicator every 100 files
-            if file_count % 100 == 0:
-                print(f"   Processed {file_count} files...")
+            for filename in files:
+                # Full path to the file
+                full_path = os.path.join(root, filename)
+                
+                # Convert to relative path from the root directory, in canonical form
+                relative_path = normalize_path(os.path.relpath(full_path, root_path))
+                
+                # Add document to list
+                documents.append({
+                    'Document Name': normalize_segment(filename),
+                    'Location': location,
+                    'Path': relative_path
+                })
+                
+                file_count += 1
+                metrics.count("files")
+    
+    if archive_max_mb is not None:
+        # Own Metrics: a new stage would reset the walk's counters
+        archive_metrics = Metrics(f"{metrics.script}.archives", metrics.metrics_path, metrics.live)
+        documents.extend(index_archives(documents, root_path, archive_max_mb, archive_workers, archive_metrics))
     
     print(f"\n[SUCCESS] Crawl complete!")
     print(f"   Files found: {file_count}")
     print(f"   Directories scanned: {dir_count}")
+    if archive_max_mb is not None:
+        print(f"   Files inside archives: {len(documents) - file_count}")
     
     return documents
 
-def write_csv(documents: list[dict], output_file: str):
+def load_locations_config(config_path: str) -> list[dict]:
+    """
+    Read crawl locations from a JSON list of {"root", "location_id", "name"?} objects.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    
+    locations = []
+    for i, entry in enumerate(entries):
+        if not entry.get('root') or not entry.get('location_id'):
+            raise ValueError(f"{config_path}: entry {i} needs both 'root' and 'location_id'")
+        locations.append({
+            'name': entry.get('name') or entry['location_id'],
+            'root': entry['root'],
+            'location_id': entry['location_id']
+        })
+    return locations
+
+def load_locations_from_db() -> list[dict]:
+    """
+    Read crawl locations from the locations table (rows with a root_path).
+    """
+    from db_connection import connect
+    
+    with connect() as conn, conn.cursor() as cur:
+        cur.execute("SELECT id, name, root_path FROM locations WHERE root_path IS NOT NULL ORDER BY name")
+        return [
+            {'name': name, 'root': root_path, 'location_id': str(location_id)}
+            for location_id, name, root_path in cur.fetchall()
+        ]
+
+def crawl_locations(locations: list[dict], metrics_path: str | None = None,
+                    workers: int | None = None, archive_max_mb: int | None = None,
+                    archive_workers: int | None = None) -> tuple[list[dict], list[dict]]:
+    """
+    Crawl several (root, location id) pairs concurrently.
+    
+    Walking is dominated by filesystem calls that release the GIL, so a thread
+    per location overlaps them well, especially across different drives.
+    
+    Returns:
+        tuple: (documents from all locations in config order, per-location stats)
+    """
+    def crawl_one(location: dict) -> tuple[list[dict], dict]:
+        metrics = Metrics(f"crawl[{location['name']}]", metrics_path, live=False)
+        start = time.perf_counter()
+        documents = crawl_directory(location['root'], metrics, location['location_id'],
+                                    archive_max_mb, archive_workers)
+        seconds = time.perf_counter() - start
+        return documents, {
+            'name': location['name'],
+            'location_id': location['location_id'],
+            'root': location['root'],
+            'files': len(documents),
+            'dirs': metrics.counters.get('dirs', 0),
+            'archive_members': sum(1 for doc in documents if is_archive_member(doc['Path'])),
+            'seconds': round(seconds, 2)
+        }
+    
+    with ThreadPoolExecutor(max_workers=workers or len(locations) or 1) as pool:
+        results = list(pool.map(crawl_one, locations))
+    
+    documents = [doc for docs, _ in results for doc in docs]
+    stats = [location_stats for _, location_stats in results]
+    return documents, stats
+
+def shared_folders(documents: list[dict]) -> list[str]:
+    """
+    Return the folder paths (matching keys) that occur in more than one location,
+    outermost first.
+    """
+    locations_by_folder = {}
+    for doc in documents:
+        folder, _ = split_folder(doc['Path'])
+        while folder:
+            key = path_key(folder)
+            seen = locations_by_folder.setdefault(key, set())
+            if doc['Location'] in seen:
+                break
+            seen.add(doc['Location'])
+            folder, _ = split_folder(folder)
+    return sorted((key for key, locations in locations_by_folder.items() if len(locations) > 1),
+                  key=lambda key: (key.count("/"), key))
+
+def write_stats(stats: list[dict], output_file: str):
+    """
+    Print per-location crawl stats and write them next to the manifest.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    stats_path = os.path.join(script_dir, os.path.splitext(output_file)[0] + STATS_SUFFIX)
+    
+    print("\n[INFO] Per-location results:")
+    for s in stats:
+        print(f"   {s['name']:<30} {s['files']:>9,} files {s['dirs']:>8,} dirs {s['seconds']:>8.1f}s")
+    
+    with open(stats_path, 'w', encoding='utf-8') as f:
+        json.dump({'locations': stats, 'total_files': sum(s['files'] for s in stats)}, f, indent=2)
+    print(f"   Stats: {stats_path}")
+
+def write_csv(documents: list[dict], output_file: str, metrics: Metrics | None = None):
     """
     Write documents list to CSV file.
     
     Args:
         documents: List of document dictionaries
         output_file: Output CSV filename
+        metrics: Instrumentation to report progress to (a live-printing one by default)
     """
+    metrics = metrics or Metrics("crawl")
+    
     if not documents:
         print("[WARNING] No documents to write to CSV")
         return
@@ -83,12 +231,14 @@ def write_csv(documents: list[dict], output_file: str):
     output_path = os.path.join(script_dir, output_file)
     
     try:
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+        with metrics.stage("write_csv"), open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
             fieldnames = ['Document Name', 'Location', 'Path']
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             
             writer.writeheader()
             writer.writerows(documents)
+            metrics.count("rows", len(documents))
+            metrics.count("bytes", csvfile.tell())
         
         print(f"\n[SUCCESS] CSV file created successfully!")
         print(f"   Location: {output_path}")
@@ -99,6 +249,18 @@ def write_csv(documents: list[dict], output_file: str):
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Crawl a local Google Drive folder into a CSV manifest")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--config", help="JSON file listing the locations to crawl")
+    source.add_argument("--from-db", action="store_true", help="Crawl every location with a root_path in the locations table")
+    parser.add_argument("--workers", type=int, help="Locations crawled at once (default: all)")
+    parser.add_argument("--archives", action="store_true", help="Also list the files inside ZIP/RAR archives")
+    parser.add_argument("--archive-max-mb", type=int, default=MAX_ARCHIVE_MB, help="Skip archives larger than this")
+    parser.add_argument("--archive-workers", type=int, help="Archives listed at once")
+    add_arguments(parser)
+    args = parser.parse_args()
+    metrics = Metrics("crawl", args.metrics)
+    
     print("=" * 60)
     print("  Google Drive Directory Crawler")
     print("  Document Classification System")
@@ -106,11 +268,28 @@ def main():
     print()
     
     # Crawl the directory
-    documents = crawl_directory(SOURCE_DIRECTORY)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    stats = None
+    archive_max_mb = args.archive_max_mb if args.archives else None
+    with profiled(args.profile, os.path.join(script_dir, "crawl_google_drive.prof")):
+        if args.config or args.from_db:
+            locations = load_locations_config(args.config) if args.config else load_locations_from_db()
+            print(f"[INFO] Crawling {len(locations)} locations")
+            documents, stats = crawl_locations(locations, args.metrics, args.workers,
+                                               archive_max_mb, args.archive_workers)
+            shared = shared_folders(documents)
+            if shared:
+                print(f"[WARNING] {len(shared)} folder paths exist in more than one location, e.g. {shared[0]!r}.")
+                print("   Run extract_folders.py once per location with --location; folder rows are shared by path.")
+        else:
+            documents = crawl_directory(SOURCE_DIRECTORY, metrics, LOCATION_UUID,
+                                        archive_max_mb, args.archive_workers)
     
     if documents:
         # Write to CSV
-        write_csv(documents, OUTPUT_CSV)
+        write_csv(documents, OUTPUT_CSV, metrics)
+        if stats:
+            write_stats(stats, OUTPUT_CSV)
         print("\n[COMPLETE] Process complete! You can now use the CSV for bulk import.")
     else:
         print("\n[WARNING] No documents found. Please check the directory path.")
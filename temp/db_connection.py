@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Database Connection
+Shared Postgres connection for the ingest scripts that write to the database directly.
+
+Set DATABASE_URL to the project's Postgres connection string, either in the
+environment or in the repo's .env.local (Supabase: Project Settings ->
+Database -> Connection string -> URI).
+
+Install dependency:
+  pip install psycopg2-binary
+"""
+
+from __future__ import annotations
+import io
+import os
+
+import psycopg2
+
+ENV_FILE = ".env.local"
+URL_VARIABLE = "DATABASE_URL"
+COPY_BATCH_ROWS = 1000
+
+
+def load_env_file(path: str):
+    """Read KEY=VALUE lines from path into os.environ without overriding existing values."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, _, value = line.partition("=")
+            os.environ.setdefault(key.strip(), value.strip().strip('"').strip("'"))
+
+
+def get_database_url() -> str:
+    """Return DATABASE_URL from the environment or the repo's .env.local."""
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    load_env_file(os.path.join(repo_root, ENV_FILE))
+    url = os.environ.get(URL_VARIABLE)
+    if not url:
+        raise RuntimeError(f"{URL_VARIABLE} is not set (add it to the environment or {ENV_FILE})")
+    return url
+
+
+def connect(url: str | None = None):
+    """Open a psycopg2 connection to url (default: DATABASE_URL)."""
+    return psycopg2.connect(url or get_database_url())
+
+
+def copy_escape(value) -> str:
+    """Format a value for COPY's text format (None becomes NULL)."""
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def copy_rows(cur, table: str, rows, batch_rows: int = COPY_BATCH_ROWS) -> int:
+    """
+    COPY an iterable of tuples into table in batches, so only batch_rows rows
+    are buffered at a time. Returns the number of rows copied.
+    """
+    total = 0
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(copy_escape(v) for v in row) + "\n")
+        total += 1
+        if total % batch_rows == 0:
+            buffer.seek(0)
+            cur.copy_expert(f"COPY {table} FROM STDIN", buffer)
+            buffer = io.StringIO()
+    if buffer.tell():
+        buffer.seek(0)
+        cur.copy_expert(f"COPY {table} FROM STDIN", buffer)
+    return total
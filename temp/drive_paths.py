@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Drive Path Normalization
+Shared helpers so every ingest script agrees on what a document path looks like.
+
+Canonical form:
+  - segments separated by '/' regardless of the OS the crawl ran on
+  - each segment in Unicode NFC (macOS hands out NFD file names)
+  - no leading, trailing or repeated separators
+
+Keys (for matching folders across stages) are the canonical path case-folded,
+since Google Drive for desktop treats names case-insensitively on Windows/macOS.
+
+Files listed from inside an archive get a virtual path, the archive's path and
+the member's path joined by ARCHIVE_SEPARATOR: 'Lectures/tapes.zip!/1954/ACC.pdf'.
+The separator only counts after an archive extension, so an ordinary folder
+whose name ends in '!' ('Wow!/doc.pdf') is not mistaken for an archive.
+"""
+
+import re
+import unicodedata
+import urllib.parse
+from functools import lru_cache
+
+SEPARATOR = "/"
+ARCHIVE_SEPARATOR = "!/"
+ARCHIVE_EXTENSIONS = ("zip", "rar")
+_ARCHIVE_MEMBER = re.compile(
+    r"\.(?:" + "|".join(ARCHIVE_EXTENSIONS) + r")" + re.escape(ARCHIVE_SEPARATOR), re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=65536)
+def normalize_segment(segment: str) -> str:
+    """Return a single path segment in NFC with surrounding whitespace removed."""
+    return unicodedata.normalize("NFC", segment.strip())
+
+
+@lru_cache(maxsize=65536)
+def segment_key(segment: str) -> str:
+    """Return the case-folded matching key for an already normalized segment."""
+    return segment.casefold()
+
+
+def split_path(path: str) -> list[str]:
+    """Split a path on either separator into normalized, non-empty segments."""
+    if not path:
+        return []
+    segments = (normalize_segment(s) for s in path.replace("\\", SEPARATOR).split(SEPARATOR))
+    return [s for s in segments if s]
+
+
+def normalize_path(path: str) -> str:
+    """Return the canonical '/'-separated NFC form of a path."""
+    return SEPARATOR.join(split_path(path))
+
+
+def path_key(path: str) -> str:
+    """Return the case-folded canonical key used to match the same folder across stages."""
+    return SEPARATOR.join(segment_key(s) for s in split_path(path))
+
+
+def split_folder(path: str) -> tuple[str, str]:
+    """
+    Split a path into (folder_path, file_name), both canonical.
+    folder_path is '' for documents at the root.
+    """
+    folder, _, name = normalize_path(path).rpartition(SEPARATOR)
+    return folder, name
+
+
+def escape_like(path: str) -> str:
+    """Escape LIKE wildcards so a path can be used as a literal prefix pattern."""
+    return path.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def file_url(root: str, relative_path: str) -> str:
+    """
+    Build a percent-encoded file:// URL for relative_path under root.
+    Works for both Windows roots (G:\\My Drive\\...) and POSIX roots (/mnt/drive/...).
+    """
+    # normalize_path drops the leading '/' of POSIX roots, and drive-letter
+    # roots need one anyway (file:///G:/...), so it is always added back here
+    full_path = SEPARATOR.join(filter(None, [normalize_path(root), normalize_path(relative_path)]))
+    return "file://" + urllib.parse.quote(SEPARATOR + full_path, safe="/:")
+
+
+def archive_member_path(archive_path: str, member: str) -> str:
+    """Return the virtual path of a member inside the archive at archive_path."""
+    return f"{normalize_path(archive_path)}{ARCHIVE_SEPARATOR}{normalize_path(member)}"
+
+
+def split_archive_path(path: str) -> tuple[str, str | None]:
+    """
+    Split a virtual path into (archive_path, member_path).
+    member_path is None for ordinary paths.
+    """
+    match = _ARCHIVE_MEMBER.search(path)
+    if not match:
+        return path, None
+    return path[:match.end() - len(ARCHIVE_SEPARATOR)], path[match.end():]
+
+
+def is_archive_member(path: str) -> bool:
+    """True for the virtual path of a file inside an archive."""
+    return _ARCHIVE_MEMBER.search(path) is not None
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Document Export
+Streams documents with their classification out of the database for auditing,
+without the SQL Editor's row cap or timeout.
+
+Rows are read in keyset-paginated batches ordered by (created_at, id): each
+batch starts after the last (created_at, id) seen, so every page is an index
+range scan (scripts/030_add_documents_keyset_index.sql) and memory stays at
+one batch however large the table is. With --copy the same query is streamed
+through COPY ... TO STDOUT instead, which is fastest but holds one snapshot
+for the whole export.
+
+Folder path and org-structure names (executive director, secretary, division,
+department), document type and location name are joined in.
+
+Formats:
+  csv       every column below
+  manifest  the crawler manifest (Document Name, Location, Path), readable by
+            manifest_reader.iter_manifest and the other ingest scripts
+
+Install dependency:
+  pip install psycopg2-binary
+
+Usage:
+  python export_documents.py                              # classified documents -> CSV
+  python export_documents.py --status all --output all_documents.csv
+  python export_documents.py --format manifest --status unclassified
+  python export_documents.py --copy
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import os
+
+from db_connection import connect
+from ingest_metrics import Metrics, add_arguments, profiled
+from manifest_reader import COLUMNS as MANIFEST_COLUMNS
+
+OUTPUT_CSV = "documents_export.csv"
+BATCH_SIZE = 5000
+
+EXPORT_COLUMNS = [
+    ("id", "d.id"),
+    ("title", "d.title"),
+    ("status", "d.status"),
+    ("priority", "d.priority"),
+    ("access_level", "d.access_level"),
+    ("executive_director", "ed.name"),
+    ("secretary", "s.name"),
+    ("division", "v.name"),
+    ("department", "dp.name"),
+    ("document_type", "dt.name"),
+    ("location", "l.name"),
+    ("folder", "f.full_path"),
+    ("path", "d.path"),
+    ("file_type", "d.file_type"),
+    ("file_url", "d.file_url"),
+    ("classified_at", "d.classified_at"),
+    ("created_at", "d.created_at"),
+]
+# Manifest rows keep the location id, as the crawler writes it
+MANIFEST_SELECT = ["d.title", "d.location", "d.path"]
+
+FROM_CLAUSE = """
+    FROM documents d
+    LEFT JOIN executive_directors ed ON ed.id = d.executive_director_id
+    LEFT JOIN secretaries s ON s.id = d.secretary_id
+    LEFT JOIN divisions v ON v.id = d.division_id
+    LEFT JOIN departments dp ON dp.id = d.department_id
+    LEFT JOIN document_types dt ON dt.id = d.document_type_id
+    LEFT JOIN locations l ON l.id::text = d.location
+    LEFT JOIN folders f ON f.id = d.folder_id
+"""
+
+# Classified as the classify page counts it: the UI's priority-only bulk
+# classification sets priority without touching status
+STATUS_FILTERS = {
+    "classified": "(d.priority IS NOT NULL OR d.access_level IS NOT NULL OR d.status = 'classified')",
+    "unclassified": "(d.priority IS NULL AND d.access_level IS NULL AND d.status IS DISTINCT FROM 'classified')",
+    "all": "TRUE",
+}
+
+
+def export_query(select: list[str], status: str, keyset: bool) -> str:
+    """Build the export SELECT; the keyset form takes (created_at, id, limit) parameters."""
+    where = STATUS_FILTERS[status]
+    if keyset:
+        where += " AND (d.created_at, d.id) > (%s, %s)"
+    sql = f"SELECT {', '.join(select)}, d.created_at, d.id {FROM_CLAUSE} WHERE {where} ORDER BY d.created_at, d.id"
+    return sql + " LIMIT %s" if keyset else sql
+
+
+def export_keyset(conn, writer, select: list[str], status: str, batch_size: int, metrics: Metrics) -> int:
+    """Write every matching row in (created_at, id) batches; returns the number of rows."""
+    sql = export_query(select, status, keyset=True)
+    # Start below every real row
+    last = ("-infinity", "00000000-0000-0000-0000-000000000000")
+    total = 0
+    with conn.cursor() as cur:
+        while True:
+            cur.execute(sql, (*last, batch_size))
+            rows = cur.fetchall()
+            if not rows:
+                break
+            # The two trailing columns are the keyset cursor, not output
+            writer.writerows(row[:-2] for row in rows)
+            last = rows[-1][-2:]
+            total += len(rows)
+            metrics.count("rows", len(rows))
+            metrics.count("batches")
+            # Each batch is its own short transaction
+            conn.rollback()
+    return total
+
+
+def export_copy(conn, output_file, select: list[str], status: str, metrics: Metrics):
+    """Stream the whole export through COPY ... TO STDOUT in CSV format."""
+    # Drop the keyset columns: wrap the query and select only the output ones
+    names = [f"c{i}" for i in range(len(select))]
+    inner = export_query([f"{expr} AS {name}" for expr, name in zip(select, names)], status, keyset=False)
+    with conn.cursor() as cur:
+        cur.copy_expert(f"COPY (SELECT {', '.join(names)} FROM ({inner}) q) TO STDOUT WITH (FORMAT csv)", output_file)
+        metrics.count("bytes", output_file.tell())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export documents and their classification")
+    parser.add_argument("--output", default=OUTPUT_CSV, help="Output file (relative to this script)")
+    parser.add_argument("--format", choices=["csv", "manifest"], default="csv", help="Output columns")
+    parser.add_argument("--status", choices=sorted(STATUS_FILTERS), default="classified", help="Which documents to export")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per keyset page")
+    parser.add_argument("--copy", action="store_true", help="Stream with COPY TO instead of keyset pages")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    output_path = os.path.join(script_dir, args.output)
+    metrics = Metrics("export", args.metrics)
+
+    if args.format == "manifest":
+        header, select = list(MANIFEST_COLUMNS), MANIFEST_SELECT
+    else:
+        header, select = [name for name, _ in EXPORT_COLUMNS], [expr for _, expr in EXPORT_COLUMNS]
+
+    print("=" * 60)
+    print("  Document Export")
+    print("=" * 60)
+    print(f"[INFO] Exporting {args.status} documents as {args.format} to {output_path}")
+
+    conn = connect()
+    try:
+        with profiled(args.profile, os.path.join(script_dir, "export_documents.prof")), \
+                metrics.stage("export"), open(output_path, "w", newline="", encoding="utf-8") as f:
+            # COPY ... CSV ends rows with \n; match it so --copy files have one line ending
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(header)
+            if args.copy:
+                f.flush()
+                export_copy(conn, f, select, args.status, metrics)
+            else:
+                total = export_keyset(conn, writer, select, args.status, args.batch_size, metrics)
+                metrics.count("bytes", f.tell())
+                print(f"[INFO] {total} documents written")
+    finally:
+        conn.close()
+
+    print(f"[SUCCESS] Export complete: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,83 +2,178 @@
 """
 Folder Hierarchy Extractor for Document Classification System
 Parses the Google Drive CSV and generates SQL to populate the folders table
+
+folders.full_path has no location dimension, so the same relative folder in
+two storage locations is one folder row. When the manifest combines several
+locations (crawl_google_drive.py --config/--from-db), run this once per
+location with --location so each run links only that location's documents.
 """
 
-import csv
+import argparse
 import os
+import sys
 from pathlib import Path
 from collections import defaultdict
 import uuid
 
+from drive_paths import SEPARATOR, path_key, segment_key, split_folder
+from ingest_metrics import Metrics, add_arguments, profiled
+from manifest_reader import iter_manifest
+
 # Configuration
 CSV_FILE = "google_drive_documents.csv"
 OUTPUT_SQL = "populate_folders.sql"
 
-def parse_csv_and_extract_folders(csv_path: str) -> tuple[dict, dict]:
+class FolderNode:
+    """A single folder in the trie; its full path is built once, on creation."""
+
+    __slots__ = ('name', 'full_path', 'parent', 'level', 'children')
+
+    def __init__(self, name: str, full_path: str, parent: "FolderNode | None", level: int):
+        self.name = name
+        self.full_path = full_path
+        self.parent = parent
+        self.level = level
+        self.children = {}
+
+
+class FolderTrie:
+    """
+    Folder hierarchy builder keyed by interned path segments.
+
+    Every folder path seen so far is remembered, so a document in a known
+    folder costs a single dict lookup. For a new folder we only ascend until
+    we hit an ancestor that already exists, then create the missing nodes on
+    the way back down. Work and memory therefore grow with the number of
+    unique folders rather than with total path depth.
+
+    Paths must already be canonical (see drive_paths.normalize_path). Folders
+    are matched by drive_paths.path_key, so 'Lectures' and 'lectures' are one
+    folder and keep the spelling that was seen first.
+    """
+
+    def __init__(self):
+        self.roots = {}
+        self.nodes = {}
+        self.paths = {}
+
+    def add_folder(self, folder_path: str) -> FolderNode:
+        """Return the node for folder_path, creating it and any missing ancestors."""
+        node = self.paths.get(folder_path)
+        if node is not None:
+            return node
+
+        # Ascend until we reach a folder we already know (or the root)
+        missing = []
+        parent = None
+        current = folder_path
+        while current:
+            parent = self.paths.get(current) or self.nodes.get(path_key(current))
+            if parent is not None:
+                break
+            parent_path, _, name = current.rpartition(SEPARATOR)
+            missing.append((current, name))
+            current = parent_path
+
+        # Descend, creating each missing folder exactly once
+        for alias, name in reversed(missing):
+            name = sys.intern(name)
+            if parent:
+                full_path = sys.intern(f"{parent.full_path}{SEPARATOR}{name}")
+                node = FolderNode(name, full_path, parent, parent.level + 1)
+                parent.children[segment_key(name)] = node
+            else:
+                node = FolderNode(name, name, None, 0)
+                self.roots[segment_key(name)] = node
+            self.nodes[path_key(node.full_path)] = node
+            self.paths[node.full_path] = node
+            self.paths[alias] = node
+            parent = node
+
+        self.paths[folder_path] = parent
+        return parent
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def to_dict(self) -> dict:
+        """Flatten to the {full_path: {name, parent_path, level}} shape used by generate_sql."""
+        return {
+            node.full_path: {
+                'name': node.name,
+                'parent_path': node.parent.full_path if node.parent else None,
+                'level': node.level
+            }
+            for node in self.nodes.values()
+        }
+
+
+def parse_csv_and_extract_folders(csv_path: str, metrics: Metrics | None = None,
+                                  location: str | None = None) -> tuple[dict, dict]:
     """
     Parse CSV and extract folder hierarchy.
     
+    Args:
+        csv_path: Crawler manifest to read
+        metrics: Instrumentation to report progress to (a live-printing one by default)
+        location: Only read rows of this location id (default: every row)
+    
     Returns:
         tuple: (folders_dict, document_folders_dict)
             - folders_dict: {full_path: {name, parent_path, level}}
-            - document_folders_dict: {document_title: full_folder_path}
+            - document_folders_dict: {folder path as written in document paths:
+              [full_folder_path, document count]} for every folder that directly
+              holds documents; root documents are under '' with full path None
     """
-    folders = {}
+    trie = FolderTrie()
     document_folders = {}
+    locations = set()
+    metrics = metrics or Metrics("extract_folders")
     
     print("[INFO] Reading CSV file...")
     
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        
-        for row in reader:
-            path = row.get('Path', '').strip()
-            doc_name = row.get('Document Name', '').strip()
+    with metrics.stage("read_csv"):
+        for doc_name, doc_location, path in iter_manifest(csv_path):
+            metrics.count("rows")
+            doc_location = doc_location.strip()
+            locations.add(doc_location)
+            if location and doc_location != location:
+                continue
+            path = path.strip()
+            doc_name = doc_name.strip()
             
             if not path:
                 continue
             
-            # Check if path contains backslash (folder structure)
-            if '\\' in path:
-                # Extract folder path (everything before the last backslash)
-                parts = path.split('\\')
-                
-                # The file is the last part
-                # The folders are everything before
-                folder_parts = parts[:-1]
-                
-                # Build folder hierarchy
-                current_path = ""
-                for i, folder_name in enumerate(folder_parts):
-                    if current_path:
-                        parent_path = current_path
-                        current_path = f"{current_path}\\{folder_name}"
-                    else:
-                        parent_path = None
-                        current_path = folder_name
-                    
-                    if current_path not in folders:
-                        folders[current_path] = {
-                            'name': folder_name,
-                            'parent_path': parent_path,
-                            'level': i
-                        }
-                
-                # Map document to its folder
-                document_folders[doc_name] = current_path
-            else:
-                # Document is in root (no folder)
-                document_folders[doc_name] = None
+            # Everything before the last separator is the folder path
+            folder_path, _ = split_folder(path)
+            
+            entry = document_folders.get(folder_path)
+            if entry is None:
+                # Keyed by the spelling in the path, so documents can be joined on it;
+                # the trie maps it to the folder's (interned) canonical path
+                full_path = trie.add_folder(folder_path).full_path if folder_path else None
+                entry = document_folders[folder_path] = [full_path, 0]
+            entry[1] += 1
+    
+    folders = trie.to_dict()
+    
+    if not location and len(locations) > 1:
+        print(f"[WARNING] The CSV holds {len(locations)} locations; folders with the same relative path "
+              f"are merged across them. Run once per location with --location to keep the links per location.")
     
     print(f"[SUCCESS] Extracted {len(folders)} unique folders")
-    print(f"[SUCCESS] Mapped {len(document_folders)} documents to folders")
+    print(f"[SUCCESS] Mapped {sum(count for _, count in document_folders.values())} documents to folders")
     
     return folders, document_folders
 
-def generate_sql(folders: dict, document_folders: dict, output_path: str):
+def generate_sql(folders: dict, document_folders: dict, output_path: str, metrics: Metrics | None = None,
+                 location: str | None = None):
     """
     Generate SQL INSERT statements for folders and UPDATE statements for documents.
+    With location, only that location's documents are updated.
     """
+    metrics = metrics or Metrics("extract_folders")
     print(f"\n[INFO] Generating SQL file: {output_path}")
     
     # Sort folders by level to ensure parents are inserted before children
@@ -89,73 +184,95 @@ def generate_sql(folders: dict, document_folders: dict, output_path: str):
     for full_path, _ in sorted_folders:
         folder_uuids[full_path] = str(uuid.uuid4())
     
-    with open(output_path, 'w', encoding='utf-8') as f:
+    location_filter = f"\n  AND location = '{location.replace(chr(39), chr(39) * 2)}'" if location else ""
+    
+    with metrics.stage("write_sql"), open(output_path, 'w', encoding='utf-8') as f:
         f.write("-- Auto-generated SQL for populating folders table\n")
         f.write("-- Generated by extract_folders.py\n")
         f.write("-- Run this script after creating the folders table\n\n")
         
         f.write("BEGIN;\n\n")
         
-        # Insert folders
+        # Insert folders one level at a time, looking each parent up by full_path,
+        # so folders that already exist from an earlier run (e.g. another
+        # location) are reused as parents
         f.write("-- Insert folder hierarchy\n")
-        f.write("INSERT INTO folders (id, name, parent_id, full_path, level) VALUES\n")
         
-        folder_inserts = []
+        folders_by_level = defaultdict(list)
         for full_path, folder_info in sorted_folders:
-            folder_id = folder_uuids[full_path]
-            name = folder_info['name'].replace("'", "''")  # Escape single quotes
-            parent_id = folder_uuids.get(folder_info['parent_path'], None)
-            parent_id_str = f"'{parent_id}'" if parent_id else "NULL"
-            full_path_escaped = full_path.replace("'", "''")
-            level = folder_info['level']
-            
-            folder_inserts.append(
-                f"  ('{folder_id}', '{name}', {parent_id_str}, '{full_path_escaped}', {level})"
-            )
+            folders_by_level[folder_info['level']].append((full_path, folder_info))
         
-        f.write(",\n".join(folder_inserts))
-        f.write("\nON CONFLICT (full_path) DO NOTHING;\n\n")
+        for level, level_folders in sorted(folders_by_level.items()):
+            folder_inserts = []
+            for full_path, folder_info in level_folders:
+                folder_id = folder_uuids[full_path]
+                name = folder_info['name'].replace("'", "''")  # Escape single quotes
+                parent_path = folder_info['parent_path']
+                parent_path_str = "'" + parent_path.replace("'", "''") + "'" if parent_path else "NULL"
+                full_path_escaped = full_path.replace("'", "''")
+                
+                folder_inserts.append(
+                    f"  ('{folder_id}'::uuid, '{name}', {parent_path_str}, '{full_path_escaped}', {level})"
+                )
+            
+            f.write("INSERT INTO folders (id, name, parent_id, full_path, level)\n")
+            f.write("SELECT v.id, v.name, p.id, v.full_path, v.level FROM (VALUES\n")
+            f.write(",\n".join(folder_inserts))
+            f.write("\n) AS v(id, name, parent_path, full_path, level)\n")
+            f.write("LEFT JOIN folders p ON p.full_path = v.parent_path\n")
+            f.write("ON CONFLICT (full_path) DO NOTHING;\n\n")
+            metrics.count("rows", len(folder_inserts))
+            metrics.count("statements")
         
         # Update documents with folder_id
+        # Link documents with one set-based UPDATE: each document's folder part
+        # (everything before the last separator) joined to the folder it maps to
         f.write("-- Update documents with folder references\n")
-        f.write("-- This links each document to its folder\n\n")
-        
-        # Group documents by folder for more efficient updates
-        folder_to_docs = defaultdict(list)
-        root_docs = []
+        f.write("-- This links each document to the folder that directly holds it\n\n")
         
-        for doc_name, folder_path in document_folders.items():
-            if folder_path:
-                folder_to_docs[folder_path].append(doc_name)
-            else:
-                root_docs.append(doc_name)
+        folder_links = [
+            (folder_path, full_path)
+            for folder_path, (full_path, _) in sorted(document_folders.items())
+            if full_path
+        ]
+        root_docs = document_folders.get("", [None, 0])[1]
         
-        update_count = 0
-        for folder_path, doc_names in folder_to_docs.items():
-            folder_id = folder_uuids.get(folder_path)
-            if folder_id:
-                folder_path_escaped = folder_path.replace("'", "''")
-                f.write(f"-- Update documents in folder: {folder_path}\n")
-                f.write(f"UPDATE documents SET folder_id = '{folder_id}' \n")
-                f.write(f"WHERE path LIKE '{folder_path_escaped}\\%';\n\n")
-                update_count += 1
+        if folder_links:
+            values = ",\n".join(
+                "  ('{}', '{}')".format(folder_path.replace("'", "''"), full_path.replace("'", "''"))
+                for folder_path, full_path in folder_links
+            )
+            f.write("UPDATE documents d\n")
+            f.write("SET folder_id = f.id\n")
+            f.write(f"FROM (VALUES\n{values}\n) AS v(folder_path, full_path)\n")
+            f.write("JOIN folders f ON f.full_path = v.full_path\n")
+            f.write(f"WHERE substring(d.path from '^(.*){SEPARATOR}[^{SEPARATOR}]*$') = v.folder_path\n")
+            f.write(f"  AND d.folder_id IS DISTINCT FROM f.id{location_filter.replace('location', 'd.location')};\n\n")
+            metrics.count("statements")
         
-        f.write(f"-- Total folder update statements: {update_count}\n")
-        f.write(f"-- Total root documents (no folder): {len(root_docs)}\n\n")
+        f.write(f"-- Folders holding documents: {len(folder_links)}\n")
+        f.write(f"-- Total root documents (no folder): {root_docs}\n\n")
         
         f.write("COMMIT;\n\n")
         f.write("-- Verify results\n")
         f.write("SELECT COUNT(*) as total_folders FROM folders;\n")
         f.write("SELECT COUNT(*) as documents_with_folders FROM documents WHERE folder_id IS NOT NULL;\n")
         f.write("SELECT COUNT(*) as documents_without_folders FROM documents WHERE folder_id IS NULL;\n")
+        metrics.count("bytes", f.tell())
     
     print(f"[SUCCESS] SQL file generated: {output_path}")
     print(f"   - Folders to insert: {len(folders)}")
-    print(f"   - Folder update statements: {update_count}")
-    print(f"   - Root documents (no folder): {len(root_docs)}")
+    print(f"   - Folders holding documents: {len(folder_links)}")
+    print(f"   - Root documents (no folder): {root_docs}")
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Extract the folder hierarchy from the crawler CSV")
+    parser.add_argument("--location", help="Only build folders for and link documents of this location id")
+    add_arguments(parser)
+    args = parser.parse_args()
+    metrics = Metrics("extract_folders", args.metrics)
+    
     print("=" * 60)
     print("  Folder Hierarchy Extractor")
     print("  Document Classification System")
@@ -172,11 +289,12 @@ def main():
         print(f"[ERROR] CSV file not found: {csv_path}")
         return
     
-    # Parse CSV and extract folders
-    folders, document_folders = parse_csv_and_extract_folders(csv_path)
-    
-    # Generate SQL
-    generate_sql(folders, document_folders, output_path)
+    with profiled(args.profile, os.path.join(script_dir, "extract_folders.prof")):
+        # Parse CSV and extract folders
+        folders, document_folders = parse_csv_and_extract_folders(csv_path, metrics, args.location)
+        
+        # Generate SQL
+        generate_sql(folders, document_folders, output_path, metrics, args.location)
     
     print("\n" + "=" * 60)
     print("NEXT STEPS:")
@@ -184,6 +302,7 @@ def main():
     print("1. Run scripts/017_create_folders_table.sql in Supabase")
     print("2. Run scripts/018_add_folder_id_to_documents.sql in Supabase")
     print("3. Run temp/populate_folders.sql in Supabase")
+    print("4. Run temp/build_folder_snapshot.py to refresh the classify page folder tree")
     print("=" * 60)
 
 if __name__ == "__main__":
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Document Text Extractor
+Pulls body text out of PDF, DOCX and TXT files listed in the crawler manifest
+and bulk-loads it into document_contents for full-text search
+(scripts/027_create_document_contents_table.sql).
+
+Extraction runs on a process pool. Results are cached by content hash
+(SHA-256) under text_cache/, and an index of path -> (size, mtime, hash)
+means unchanged files are neither re-read nor re-extracted on later runs;
+identical files in different folders are extracted once.
+
+Loading first copies (location, path, hash) keys into a staging table and
+asks the database which documents have no document_contents row or one with
+a different hash, so re-imported or re-created documents (whose rows were
+cascade-deleted) get their text back. Only those texts are copied and
+upserted in one statement. The GIN index on the generated content_tsv
+column serves body-text queries; nothing in the app queries it yet, so for
+now it is only reachable from the SQL editor.
+
+Install dependencies:
+  pip install pypdf psycopg2-binary
+
+Usage:
+  python extract_text.py                          # crawler SOURCE_DIRECTORY
+  python extract_text.py --config crawl_locations.json
+  python extract_text.py --no-load                # extract into the cache only
+"""
+
+from __future__ import annotations
+import argparse
+import html
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader
+
+from content_hash import cache_path, hash_file, index_key, is_unchanged, load_index, save_index
+from crawl_google_drive import LOCATION_UUID, SOURCE_DIRECTORY, load_locations_config
+from ingest_metrics import Metrics, add_arguments, profiled
+from manifest_reader import local_files
+
+CSV_FILE = "google_drive_documents.csv"
+CACHE_DIR = "text_cache"
+INDEX_FILE = "index.json"
+TEXT_SUFFIX = ".txt"
+EXTENSIONS = {"pdf", "docx", "txt"}
+# to_tsvector rejects documents over 1 MB, so keep well under it
+MAX_TEXT_CHARS = 500_000
+
+DOCX_PARAGRAPH = re.compile(r"</w:p>")
+DOCX_TAG = re.compile(r"<[^>]+>")
+
+
+def extract_pdf(path: str) -> str:
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_docx(path: str) -> str:
+    # A .docx is a zip; body text lives in <w:t> runs of word/document.xml
+    with zipfile.ZipFile(path) as archive:
+        xml = archive.read("word/document.xml").decode("utf-8", errors="replace")
+    return html.unescape(DOCX_TAG.sub("", DOCX_PARAGRAPH.sub("\n", xml)))
+
+
+def extract_txt(path: str) -> str:
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("cp1252", errors="replace")
+
+
+EXTRACTORS = {"pdf": extract_pdf, "docx": extract_docx, "txt": extract_txt}
+
+
+def extract_to_cache(path: str, cache_dir: str) -> tuple[str | None, bool, str | None]:
+    """
+    Worker: hash a file and extract its text into the cache unless that hash is cached.
+
+    Returns:
+        tuple: (content_hash, extracted, error)
+    """
+    try:
+        content_hash = hash_file(path)
+        target = cache_path(cache_dir, content_hash, TEXT_SUFFIX)
+        if os.path.exists(target):
+            return content_hash, False, None
+
+        ext = path.rsplit(".", 1)[-1].lower()
+        # Postgres text cannot hold NUL characters
+        text = EXTRACTORS[ext](path).replace("\x00", "")[:MAX_TEXT_CHARS]
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, target)
+        return content_hash, True, None
+    except Exception as e:
+        return None, False, f"{type(e).__name__}: {e}"
+
+
+def extract_all(files: list, index: dict, cache_dir: str, workers: int | None, metrics: Metrics):
+    """Hash/extract every file whose size or mtime changed since the last run; update index in place."""
+    pending = []
+    with metrics.stage("scan"):
+        for location, path, local_file in files:
+            metrics.count("files")
+            key = index_key(location, path)
+            try:
+                st = os.stat(local_file)
+            except OSError:
+                metrics.count("missing")
+                continue
+            entry = index.get(key)
+            if is_unchanged(entry, st) and os.path.exists(cache_path(cache_dir, entry["hash"], TEXT_SUFFIX)):
+                metrics.count("unchanged")
+                continue
+            pending.append((key, local_file, st))
+
+    print(f"[INFO] {len(pending)} new or changed files to extract")
+    with metrics.stage("extract"), ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(extract_to_cache, [p[1] for p in pending], [cache_dir] * len(pending), chunksize=16)
+        for (key, local_file, st), (content_hash, extracted, error) in zip(pending, results):
+            if error:
+                print(f"   [WARNING] {local_file}: {error}")
+                metrics.count("errors")
+                continue
+            index[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": content_hash}
+            metrics.count("extracted" if extracted else "cached")
+            metrics.count("bytes", st.st_size)
+
+
+def load_contents(conn, index: dict, cache_dir: str, metrics: Metrics):
+    """Upsert cached texts for documents whose document_contents row is missing or has another hash."""
+    from db_connection import copy_rows
+
+    cached = {key: entry["hash"] for key, entry in index.items() if entry.get("hash")}
+    if not cached:
+        return
+
+    with metrics.stage("load"), conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TEMP TABLE staging_keys (
+              location TEXT, path TEXT, content_hash TEXT
+            ) ON COMMIT DROP
+            """
+        )
+
+        def keys():
+            for key, content_hash in cached.items():
+                location, _, path = key.partition("|")
+                yield location, path, content_hash
+
+        copy_rows(cur, "staging_keys", keys())
+
+        # Documents not imported yet have no row to join and are picked up on a later run
+        cur.execute(
+            """
+            SELECT s.location, s.path FROM staging_keys s
+            JOIN documents d ON d.location = s.location AND d.path = s.path
+            LEFT JOIN document_contents c ON c.document_id = d.id
+            WHERE c.content_hash IS DISTINCT FROM s.content_hash
+            """
+        )
+        changed = [index_key(location, path) for location, path in cur.fetchall()]
+        print(f"[INFO] Loading {len(changed)} missing or changed texts")
+        if not changed:
+            return
+
+        cur.execute(
+            """
+            CREATE TEMP TABLE staging_contents (
+              location TEXT, path TEXT, content_hash TEXT, content_text TEXT
+            ) ON COMMIT DROP
+            """
+        )
+
+        def rows():
+            for key in changed:
+                location, _, path = key.partition("|")
+                with open(cache_path(cache_dir, cached[key], TEXT_SUFFIX), "r", encoding="utf-8") as f:
+                    text = f.read()
+                metrics.count("rows")
+                yield location, path, cached[key], text
+
+        copy_rows(cur, "staging_contents", rows())
+
+        cur.execute(
+            """
+            INSERT INTO document_contents (document_id, content_hash, content_text)
+            SELECT d.id, s.content_hash, s.content_text
+            FROM staging_contents s
+            JOIN documents d ON d.location = s.location AND d.path = s.path
+            ON CONFLICT (document_id) DO UPDATE
+              SET content_hash = EXCLUDED.content_hash,
+                  content_text = EXCLUDED.content_text,
+                  extracted_at = NOW()
+              WHERE document_contents.content_hash <> EXCLUDED.content_hash
+            """
+        )
+        metrics.count("upserted", cur.rowcount)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract document text for full-text search")
+    parser.add_argument("--csv", default=CSV_FILE, help="Crawler manifest")
+    parser.add_argument("--config", help="Locations JSON (as for crawl_google_drive.py) mapping location ids to roots")
+    parser.add_argument("--root", default=SOURCE_DIRECTORY, help="Root for the default location when --config is not given")
+    parser.add_argument("--workers", type=int, help="Extraction processes (default: CPU count)")
+    parser.add_argument("--no-load", action="store_true", help="Only fill the cache; do not write to the database")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    csv_path = os.path.join(script_dir, args.csv)
+    cache_dir = os.path.join(script_dir, CACHE_DIR)
+    index_path = os.path.join(cache_dir, INDEX_FILE)
+
+    if not os.path.exists(csv_path):
+        print(f"[ERROR] CSV file not found: {csv_path}")
+        return
+
+    if args.config:
+        roots = {loc["location_id"]: loc["root"] for loc in load_locations_config(args.config)}
+    else:
+        roots = {LOCATION_UUID: args.root}
+
+    os.makedirs(cache_dir, exist_ok=True)
+    metrics = Metrics("extract_text", args.metrics)
+    index = load_index(index_path)
+
+    with profiled(args.profile, os.path.join(script_dir, "extract_text.prof")):
+        files = local_files(csv_path, roots, EXTENSIONS)
+        print(f"[INFO] {len(files)} PDF/DOCX/TXT files in manifest")
+        try:
+            extract_all(files, index, cache_dir, args.workers, metrics)
+        finally:
+            save_index(index, index_path)
+
+        if not args.no_load:
+            from db_connection import connect
+            conn = connect()
+            try:
+                load_contents(conn, index, cache_dir, metrics)
+            finally:
+                conn.close()
+
+    print("[SUCCESS] Text extraction complete")
+
+
+if __name__ == "__main__":
+    main()
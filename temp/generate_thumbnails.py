@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Document Thumbnail Generator
+Renders first-page previews for images and PDFs so reviewers can see a document
+on the classify page without opening it.
+
+Thumbnails are rendered on a process pool and stored content-addressed
+(<sha256>.jpg) in data/thumbnails/, which the Next.js app serves to signed-in
+users as /api/thumbnails/<sha256> (app/api/thumbnails/[hash]/route.ts), so
+the cache can be refreshed without rebuilding the app. The cache is capped in
+size: only thumbnails no file in the manifest uses any more are evicted,
+least recently used first, and a warning is printed if the ones in use alone
+exceed the cap. A path -> (size, mtime, hash) index means unchanged files are
+never re-read or re-rendered, and identical files share one thumbnail.
+
+Each document's thumbnail URL is written to documents.thumbnail_url
+(scripts/028_add_thumbnail_url_to_documents.sql) with one set-based UPDATE.
+
+Install dependencies:
+  pip install Pillow pypdfium2 psycopg2-binary
+
+Usage:
+  python generate_thumbnails.py
+  python generate_thumbnails.py --config crawl_locations.json --max-cache-mb 2048
+  python generate_thumbnails.py --no-update      # render only
+"""
+
+from __future__ import annotations
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pypdfium2
+from PIL import Image
+
+from content_hash import cache_path, hash_file, index_key, is_unchanged, load_index, save_index
+from crawl_google_drive import LOCATION_UUID, SOURCE_DIRECTORY, load_locations_config
+from ingest_metrics import Metrics, add_arguments, profiled
+from manifest_reader import local_files
+
+CSV_FILE = "google_drive_documents.csv"
+CACHE_DIR = os.path.join("..", "data", "thumbnails")
+BASE_URL = "/api/thumbnails"
+INDEX_FILE = "index.json"
+THUMB_SUFFIX = ".jpg"
+THUMB_SIZE = (320, 320)
+JPEG_QUALITY = 80
+PDF_RENDER_SCALE = 0.5
+MAX_CACHE_MB = 1024
+
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "bmp", "tif", "tiff", "webp"}
+EXTENSIONS = IMAGE_EXTENSIONS | {"pdf"}
+
+
+def open_preview(path: str) -> Image.Image:
+    """Return the first page of a PDF or the first frame of an image."""
+    if path.rsplit(".", 1)[-1].lower() == "pdf":
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            return pdf[0].render(scale=PDF_RENDER_SCALE).to_pil()
+        finally:
+            pdf.close()
+    image = Image.open(path)
+    # Decode at reduced size where the format supports it (JPEG)
+    image.draft("RGB", THUMB_SIZE)
+    return image
+
+
+def render_to_cache(path: str, cache_dir: str) -> tuple[str | None, bool, str | None]:
+    """
+    Worker: hash a file and render its thumbnail unless that hash is cached.
+
+    Returns:
+        tuple: (content_hash, rendered, error)
+    """
+    try:
+        content_hash = hash_file(path)
+        target = cache_path(cache_dir, content_hash, THUMB_SUFFIX)
+        if os.path.exists(target):
+            return content_hash, False, None
+
+        with open_preview(path) as image:
+            image.thumbnail(THUMB_SIZE)
+            thumb = image.convert("RGB")
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        thumb.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        os.replace(tmp, target)
+        return content_hash, True, None
+    except Exception as e:
+        return None, False, f"{type(e).__name__}: {e}"
+
+
+def render_all(files: list, index: dict, cache_dir: str, workers: int | None, metrics: Metrics):
+    """Render thumbnails for new or changed files and touch the ones still in use."""
+    pending = []
+    with metrics.stage("scan"):
+        for location, path, local_file in files:
+            metrics.count("files")
+            key = index_key(location, path)
+            try:
+                st = os.stat(local_file)
+            except OSError:
+                metrics.count("missing")
+                continue
+            entry = index.get(key)
+            # Entries whose thumbnail was evicted keep no hash and are rendered again
+            target = cache_path(cache_dir, entry["hash"], THUMB_SUFFIX) if entry and entry["hash"] else None
+            if target and is_unchanged(entry, st) and os.path.exists(target):
+                # Mark as recently used for LRU eviction
+                os.utime(target)
+                metrics.count("unchanged")
+                continue
+            pending.append((key, local_file, st))
+
+    print(f"[INFO] {len(pending)} new or changed files to render")
+    with metrics.stage("render"), ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(render_to_cache, [p[1] for p in pending], [cache_dir] * len(pending), chunksize=8)
+        for (key, local_file, st), (content_hash, rendered, error) in zip(pending, results):
+            if error:
+                print(f"   [WARNING] {local_file}: {error}")
+                metrics.count("errors")
+                continue
+            if not rendered:
+                os.utime(cache_path(cache_dir, content_hash, THUMB_SUFFIX))
+            index[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": content_hash}
+            metrics.count("rendered" if rendered else "cached")
+
+
+def evict_lru(cache_dir: str, max_bytes: int, referenced: set[str], metrics: Metrics) -> set[str]:
+    """
+    Delete least recently used thumbnails that are not in referenced until the
+    cache fits max_bytes; return evicted hashes. Thumbnails still in use are kept.
+    """
+    entries = []
+    total = 0
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            if not name.endswith(THUMB_SUFFIX):
+                continue
+            full_path = os.path.join(root, name)
+            st = os.stat(full_path)
+            content_hash = name[:-len(THUMB_SUFFIX)]
+            total += st.st_size
+            if content_hash not in referenced:
+                entries.append((st.st_mtime_ns, st.st_size, full_path, content_hash))
+
+    evicted = set()
+    entries.sort()
+    for _, size, full_path, content_hash in entries:
+        if total <= max_bytes:
+            break
+        os.remove(full_path)
+        total -= size
+        evicted.add(content_hash)
+        metrics.count("evicted")
+
+    print(f"[INFO] Thumbnail cache: {total / 1_048_576:.1f} MB, {len(evicted)} evicted")
+    if total > max_bytes:
+        print(f"[WARNING] Thumbnails in use exceed the {max_bytes / 1_048_576:.0f} MB cap; raise --max-cache-mb")
+    return evicted
+
+
+def thumbnail_url(content_hash: str) -> str:
+    return f"{BASE_URL}/{content_hash}"
+
+
+def update_documents(conn, index: dict, metrics: Metrics):
+    """Write every document's thumbnail URL (NULL once evicted) with one UPDATE."""
+    from db_connection import copy_rows
+
+    with metrics.stage("update"), conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TEMP TABLE staging_thumbnails (location TEXT, path TEXT, thumbnail_url TEXT)
+            ON COMMIT DROP
+            """
+        )
+        rows = (
+            (*key.split("|", 1), thumbnail_url(entry["hash"]) if entry["hash"] else None)
+            for key, entry in index.items()
+        )
+        metrics.count("rows", copy_rows(cur, "staging_thumbnails", rows))
+        cur.execute(
+            """
+            UPDATE documents d
+            SET thumbnail_url = s.thumbnail_url
+            FROM staging_thumbnails s
+            WHERE d.location = s.location AND d.path = s.path
+              AND d.thumbnail_url IS DISTINCT FROM s.thumbnail_url
+            """
+        )
+        metrics.count("updated", cur.rowcount)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render document thumbnails into a content-addressed cache")
+    parser.add_argument("--csv", default=CSV_FILE, help="Crawler manifest")
+    parser.add_argument("--config", help="Locations JSON (as for crawl_google_drive.py) mapping location ids to roots")
+    parser.add_argument("--root", default=SOURCE_DIRECTORY, help="Root for the default location when --config is not given")
+    parser.add_argument("--workers", type=int, help="Render processes (default: CPU count)")
+    parser.add_argument("--max-cache-mb", type=int, default=MAX_CACHE_MB, help="Thumbnail cache size cap")
+    parser.add_argument("--no-update", action="store_true", help="Only render; do not write thumbnail URLs to the database")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    csv_path = os.path.join(script_dir, args.csv)
+    cache_dir = os.path.normpath(os.path.join(script_dir, CACHE_DIR))
+    index_path = os.path.join(cache_dir, INDEX_FILE)
+
+    if not os.path.exists(csv_path):
+        print(f"[ERROR] CSV file not found: {csv_path}")
+        return
+
+    if args.config:
+        roots = {loc["location_id"]: loc["root"] for loc in load_locations_config(args.config)}
+    else:
+        roots = {LOCATION_UUID: args.root}
+
+    os.makedirs(cache_dir, exist_ok=True)
+    metrics = Metrics("thumbnails", args.metrics)
+    index = load_index(index_path)
+
+    with profiled(args.profile, os.path.join(script_dir, "generate_thumbnails.prof")):
+        files = local_files(csv_path, roots, EXTENSIONS)
+        print(f"[INFO] {len(files)} image/PDF files in manifest")
+        try:
+            render_all(files, index, cache_dir, args.workers, metrics)
+        finally:
+            save_index(index, index_path)
+
+        # Only thumbnails of files that left the manifest are evicted; their entries lose the URL
+        in_manifest = (index.get(index_key(location, path)) for location, path, _ in files)
+        referenced = {entry["hash"] for entry in in_manifest if entry and entry["hash"]}
+        evicted = evict_lru(cache_dir, args.max_cache_mb * 1_048_576, referenced, metrics)
+        for entry in index.values():
+            if entry["hash"] in evicted:
+                entry.update(size=None, mtime_ns=None, hash=None)
+        save_index(index, index_path)
+
+        if not args.no_update:
+            from db_connection import connect
+            conn = connect()
+            try:
+                update_documents(conn, index, metrics)
+            finally:
+                conn.close()
+
+    print("[SUCCESS] Thumbnails complete")
+
+
+if __name__ == "__main__":
+    main()
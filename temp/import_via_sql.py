@@ -5,10 +5,14 @@ Generates SQL INSERT statements from CSV for direct Supabase import
 This bypasses the web UI completely
 """
 
-import csv
+import argparse
 import os
 import uuid
 
+from drive_paths import normalize_path, normalize_segment
+from ingest_metrics import Metrics, add_arguments, profiled
+from manifest_reader import iter_manifest
+
 CSV_FILE = "google_drive_documents.csv"
 OUTPUT_SQL = "import_documents_direct.sql"
 LOCATION_UUID = "ea3bd0c5-b7cf-42be-9dfa-7002d75fc8cd"
@@ -27,18 +31,18 @@ def get_file_type(filename):
     }
     return type_map.get(ext, 'Other')
 
-def generate_import_sql(csv_path, output_path):
+def generate_import_sql(csv_path, output_path, metrics=None):
+    metrics = metrics or Metrics("import_via_sql")
     print(f"[INFO] Reading CSV: {csv_path}")
     
     documents = []
     
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        
-        for row in reader:
-            doc_name = row['Document Name'].strip()
-            location = row['Location'].strip()
-            path = row['Path'].strip()
+    with metrics.stage("read_csv"):
+        for doc_name, location, path in iter_manifest(csv_path):
+            metrics.count("rows")
+            doc_name = normalize_segment(doc_name)
+            location = location.strip()
+            path = normalize_path(path)
             
             documents.append({
                 'id': str(uuid.uuid4()),
@@ -51,7 +55,7 @@ def generate_import_sql(csv_path, output_path):
     print(f"[SUCCESS] Parsed {len(documents)} documents")
     
     # Write SQL
-    with open(output_path, 'w', encoding='utf-8') as f:
+    with metrics.stage("write_sql"), open(output_path, 'w', encoding='utf-8') as f:
         f.write("-- Direct SQL Import for Documents\n")
         f.write("-- This bypasses the web UI and imports directly\n\n")
         f.write("BEGIN;\n\n")
@@ -79,23 +83,31 @@ def generate_import_sql(csv_path, output_path):
             
             f.write(",\n".join(values))
             f.write(";\n\n")
+            metrics.count("rows", len(values))
+            metrics.count("statements")
         
         f.write("COMMIT;\n\n")
         f.write("-- Verify import\n")
         f.write("SELECT COUNT(*) as total_docs FROM documents;\n")
-        f.write("SELECT COUNT(*) FILTER (WHERE path LIKE '%\\\\%') as docs_with_folder_paths FROM documents;\n")
+        f.write("SELECT COUNT(*) FILTER (WHERE path LIKE '%/%') as docs_with_folder_paths FROM documents;\n")
+        metrics.count("bytes", f.tell())
     
     print(f"[SUCCESS] SQL file created: {output_path}")
     print(f"[INFO] This file is too large for Supabase SQL Editor")
     print(f"[INFO] But it shows the proper import format")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate direct SQL INSERTs from the crawler CSV")
+    add_arguments(parser)
+    args = parser.parse_args()
+    
     script_dir = os.path.dirname(os.path.abspath(__file__))
     csv_path = os.path.join(script_dir, CSV_FILE)
     output_path = os.path.join(script_dir, OUTPUT_SQL)
     
     if os.path.exists(csv_path):
-        generate_import_sql(csv_path, output_path)
+        with profiled(args.profile, os.path.join(script_dir, "import_via_sql.prof")):
+            generate_import_sql(csv_path, output_path, Metrics("import_via_sql", args.metrics))
     else:
         print(f"[ERROR] CSV not found: {csv_path}")
 
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Ingest Metrics
+Shared progress and timing instrumentation for the crawl, extract and import scripts.
+
+A Metrics object tracks named counters (files, dirs, bytes, rows, statements)
+inside timed stages. While a stage runs it prints a live throughput line; when
+it ends it prints a summary and, if a metrics file was given, appends one
+JSON object per line:
+
+  {"ts": ..., "script": "crawl", "event": "stage", "stage": "walk",
+   "seconds": 12.3, "counters": {"files": 31221, "dirs": 2050},
+   "rates": {"files": 2538.3, "dirs": 166.7}}
+
+Progress events with the same shape ("event": "progress") are appended at the
+live-line interval, so a stalled run shows up as a flat rate.
+
+Scripts expose this through add_arguments(): --metrics FILE and --profile.
+"""
+
+from __future__ import annotations
+import cProfile
+import json
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+
+LIVE_INTERVAL = 1.0
+PROFILE_TOP = 25
+
+
+class Metrics:
+    """Per-stage timers, counters and rate gauges for one script run."""
+
+    def __init__(self, script: str, metrics_path: str | None = None, live: bool = True,
+                 interval: float = LIVE_INTERVAL):
+        self.script = script
+        self.metrics_path = metrics_path
+        self.live = live
+        self.interval = interval
+        self.stage_name = None
+        self.counters = {}
+        self.stage_start = 0.0
+        self._next_tick = 0.0
+        self._tty = sys.stdout.isatty()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage; counters recorded inside it are reported with it."""
+        self.stage_name = name
+        self.counters = {}
+        self.stage_start = time.perf_counter()
+        self._next_tick = self.stage_start + self.interval
+        try:
+            yield self
+        finally:
+            seconds = time.perf_counter() - self.stage_start
+            if self.live and self._tty:
+                sys.stdout.write("\n")
+            summary = ", ".join(f"{k}={v:,}" for k, v in self.counters.items())
+            print(f"[TIMING] {self.script}.{name}: {seconds:.2f}s" + (f" ({summary})" if summary else ""))
+            self._emit("stage", seconds)
+            self.stage_name = None
+
+    def count(self, counter: str, amount: int = 1):
+        """Add amount to a counter and refresh the live line if the interval has passed."""
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+        now = time.perf_counter()
+        if now >= self._next_tick:
+            self._next_tick = now + self.interval
+            self._tick(now - self.stage_start)
+
+    def rates(self, seconds: float) -> dict:
+        """Return counter-per-second gauges for the current stage."""
+        if seconds <= 0:
+            return {}
+        return {k: round(v / seconds, 1) for k, v in self.counters.items()}
+
+    def _tick(self, seconds: float):
+        if self.live:
+            parts = [f"{v:,} {k} ({r:,.0f}/s)" for (k, v), r in zip(self.counters.items(), self.rates(seconds).values())]
+            line = f"   [{self.stage_name}] {seconds:6.1f}s  " + "  ".join(parts)
+            if self._tty:
+                sys.stdout.write("\r" + line)
+                sys.stdout.flush()
+            else:
+                print(line)
+        self._emit("progress", seconds)
+
+    def _emit(self, event: str, seconds: float):
+        if not self.metrics_path:
+            return
+        record = {
+            "ts": time.time(),
+            "script": self.script,
+            "event": event,
+            "stage": self.stage_name,
+            "seconds": round(seconds, 4),
+            "counters": dict(self.counters),
+            "rates": self.rates(seconds),
+        }
+        with open(self.metrics_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+@contextmanager
+def profiled(enabled: bool, output_path: str):
+    """Run the body under cProfile when enabled; dump stats to output_path and print the top entries."""
+    if not enabled:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
+        print(f"\n[PROFILE] Stats written to {output_path} (open with: python -m pstats {output_path})")
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+
+def add_arguments(parser):
+    """Add the shared --metrics and --profile options to a script's argument parser."""
+    parser.add_argument("--metrics", help="Append JSON-lines stage/progress metrics to this file")
+    parser.add_argument("--profile", action="store_true", help="Run under cProfile and dump stats next to the script")
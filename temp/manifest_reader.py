@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Manifest Reader
+Fast reader for the crawler manifest (google_drive_documents.csv).
+
+csv.DictReader builds a dict per row with the header strings repeated as keys,
+which dominates CPU and memory once the manifest reaches a few hundred thousand
+rows. This reader memory-maps the file, decodes it in large blocks and feeds
+the C csv parser directly, yielding plain (name, location, path) tuples.
+Quoted commas, doubled quotes and embedded newlines are handled as before.
+"""
+
+from __future__ import annotations
+import codecs
+import csv
+import io
+import mmap
+import os
+from itertools import chain
+from operator import itemgetter
+
+from drive_paths import is_archive_member, split_path
+
+# Tuple positions of each yielded row
+NAME, LOCATION, PATH = 0, 1, 2
+
+COLUMNS = ("Document Name", "Location", "Path")
+BLOCK_SIZE = 1 << 20
+
+
+def _iter_lines(mm: mmap.mmap, start: int, end: int):
+    """Yield lists of decoded lines from mm[start:end], one list per block."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    tail = ""
+    for pos in range(start, end, BLOCK_SIZE):
+        text = tail + decoder.decode(mm[pos:min(pos + BLOCK_SIZE, end)])
+        # newline='' splits on \n, \r and \r\n only and keeps the endings for csv
+        lines = io.StringIO(text, newline="").readlines()
+        # Hold back a partial last line (or a '\r' that may be half of '\r\n')
+        tail = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        yield lines
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield [tail]
+
+
+def _reader(mm: mmap.mmap, start: int, end: int):
+    return csv.reader(chain.from_iterable(_iter_lines(mm, start, end)))
+
+
+def _column_getter(header: list[str]):
+    """Return (getter, width) picking the manifest columns out of a parsed row."""
+    if header:
+        header[0] = header[0].lstrip("\ufeff")
+    positions = {name.strip(): i for i, name in enumerate(header)}
+    if "Path" not in positions:
+        raise ValueError(f"Manifest has no 'Path' column (found: {', '.join(header)})")
+    indexes = [positions.get(name) for name in COLUMNS]
+    width = max(i for i in indexes if i is not None) + 1
+
+    if None not in indexes:
+        return itemgetter(*indexes), width
+
+    def getter(fields):
+        # Missing optional columns read as ''
+        return tuple(fields[i] if i is not None else "" for i in indexes)
+
+    return getter, width
+
+
+def _rows(reader, getter, width: int):
+    for fields in reader:
+        if len(fields) >= width:
+            yield getter(fields)
+        elif fields:
+            # Short row: pad like DictReader does with missing values
+            yield getter(fields + [""] * (width - len(fields)))
+
+
+def _open_mmap(csv_path: str):
+    with open(csv_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_manifest(csv_path: str):
+    """Yield a (name, location, path) tuple for every row of the manifest."""
+    mm = _open_mmap(csv_path)
+    if mm is None:
+        return
+    with mm:
+        reader = _reader(mm, 0, len(mm))
+        getter, width = _column_getter(next(reader, []))
+        yield from _rows(reader, getter, width)
+
+
+def local_files(csv_path: str, roots: dict, extensions: set[str]) -> list[tuple[str, str, str]]:
+    """
+    Return (location, path, local_file) for every manifest row whose extension is in
+    extensions and whose location has a root directory in roots ({location_id: root}).
+    Files inside archives have no local file of their own and are left out.
+    """
+    files = []
+    for _, location, path in iter_manifest(csv_path):
+        location = location.strip()
+        root = roots.get(location)
+        if root is None or path.rsplit(".", 1)[-1].lower() not in extensions or is_archive_member(path):
+            continue
+        files.append((location, path, os.path.join(root, *split_path(path))))
+    return files
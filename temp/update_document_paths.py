@@ -4,27 +4,31 @@ Update Document Paths Script
 Updates the path column in existing documents based on the CSV file
 """
 
-import csv
+import argparse
 import os
 
+from drive_paths import normalize_path, normalize_segment
+from ingest_metrics import Metrics, add_arguments, profiled
+from manifest_reader import iter_manifest
+
 # Configuration
 CSV_FILE = "google_drive_documents.csv"
 OUTPUT_SQL = "update_document_paths.sql"
 
-def generate_path_update_sql(csv_path: str, output_path: str):
+def generate_path_update_sql(csv_path: str, output_path: str, metrics: Metrics | None = None):
     """
     Generate SQL to update document paths based on CSV
     """
+    metrics = metrics or Metrics("update_document_paths")
     print(f"[INFO] Reading CSV: {csv_path}")
     
     updates = []
     
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        
-        for row in reader:
-            doc_name = row.get('Document Name', '').strip()
-            path = row.get('Path', '').strip()
+    with metrics.stage("read_csv"):
+        for doc_name, _, path in iter_manifest(csv_path):
+            metrics.count("rows")
+            doc_name = normalize_segment(doc_name)
+            path = normalize_path(path)
             
             if doc_name and path and doc_name != path:
                 # Escape single quotes for SQL
@@ -36,7 +40,7 @@ def generate_path_update_sql(csv_path: str, output_path: str):
     print(f"[SUCCESS] Found {len(updates)} documents with folder paths to update")
     
     # Write SQL
-    with open(output_path, 'w', encoding='utf-8') as f:
+    with metrics.stage("write_sql"), open(output_path, 'w', encoding='utf-8') as f:
         f.write("-- Update document paths from CSV\n")
         f.write("-- This fixes documents where path = title (should be full folder path)\n\n")
         f.write("BEGIN;\n\n")
@@ -52,19 +56,25 @@ def generate_path_update_sql(csv_path: str, output_path: str):
             for doc_name, path in batch:
                 f.write(f"UPDATE documents SET path = '{path}' WHERE title = '{doc_name}';\n")
             f.write("\n")
+            metrics.count("statements", len(batch))
         
         f.write("COMMIT;\n\n")
         f.write("-- Verify updates\n")
         f.write("SELECT \n")
         f.write("  COUNT(*) FILTER (WHERE path = title) as paths_equal_title,\n")
-        f.write("  COUNT(*) FILTER (WHERE path LIKE '%\\\\%') as paths_with_folders,\n")
+        f.write("  COUNT(*) FILTER (WHERE path LIKE '%/%') as paths_with_folders,\n")
         f.write("  COUNT(*) as total_documents\n")
         f.write("FROM documents;\n")
+        metrics.count("bytes", f.tell())
     
     print(f"[SUCCESS] SQL file created: {output_path}")
     print(f"[INFO] Run this file in Supabase SQL Editor to update paths")
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate SQL that updates document paths from the crawler CSV")
+    add_arguments(parser)
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("  Update Document Paths Script")
     print("=" * 60)
@@ -78,7 +88,8 @@ def main():
         print(f"[ERROR] CSV file not found: {csv_path}")
         return
     
-    generate_path_update_sql(csv_path, output_path)
+    with profiled(args.profile, os.path.join(script_dir, "update_document_paths.prof")):
+        generate_path_update_sql(csv_path, output_path, Metrics("update_document_paths", args.metrics))
     
     print("\n" + "=" * 60)
     print("NEXT STEPS:")
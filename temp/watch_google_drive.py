@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Google Drive Watch Mode
+Keeps the documents and folders tables in sync with the local drive continuously.
+
+Instead of re-running crawl_google_drive.py and the import scripts after every
+change, this subscribes to filesystem events (inotify on Linux, FSEvents on
+macOS, ReadDirectoryChangesW on Windows, via watchdog) under the crawler's
+SOURCE_DIRECTORY. Bursts of events are debounced and coalesced per path, then
+applied as one small transaction:
+
+  - created files       -> INSERT into documents (skipped if the path already exists)
+  - deleted files       -> DELETE from documents
+  - moved/renamed files -> UPDATE path/title, so classifications are kept
+  - folder moves/deletes-> one set-based UPDATE/DELETE for the whole subtree
+  - missing folders     -> INSERT into folders, and folder_id is linked
+
+File changes are COPYed into a staging table and applied with one DELETE, one
+UPDATE and one INSERT, so a new folder of N files fires the folder count
+refresh trigger (scripts/023) a few times rather than N times.
+
+Only folders that are created or moved in are scanned; nothing is ever fully
+re-crawled.
+
+Install dependencies:
+  pip install watchdog psycopg2-binary
+
+Usage:
+  python watch_google_drive.py
+  python watch_google_drive.py --root "/mnt/drive/LRH-site" --location <LOCATION_UUID>
+  python watch_google_drive.py --dry-run          # print batches instead of writing
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import threading
+import time
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from crawl_google_drive import LOCATION_UUID, SOURCE_DIRECTORY
+from drive_paths import SEPARATOR, escape_like, normalize_path, split_folder, split_path
+from import_via_sql import get_file_type
+from ingest_metrics import Metrics, add_arguments
+
+DEBOUNCE_SECONDS = 2.0
+MAX_DELAY_SECONDS = 10.0
+IGNORE_NAMES = {"desktop.ini", "Thumbs.db", ".DS_Store"}
+# Google Drive for desktop writes partial downloads under these names
+IGNORE_SUFFIXES = (".tmp", ".crdownload", "~")
+
+CREATE = "create"
+DELETE = "delete"
+MOVE = "move"
+FILES = "files"
+TREE = "tree"
+
+
+class FileChanges:
+    """
+    Coalesced file changes between two tree steps.
+
+    current maps each changed path to where its row comes from: CREATE for a
+    new file, or the path the row had before the batch for a moved one, so a
+    create followed by a delete cancels out and a chain of renames collapses
+    to a single move. removed holds the pre-batch paths whose rows are deleted.
+    Keeping the two apart means a delete of x followed by a rename onto x keeps
+    both the delete and the move.
+    """
+
+    def __init__(self):
+        self.current = {}
+        self.removed = set()
+        # Pre-batch paths of rows that have moved away (the non-CREATE values of current)
+        self.origins = set()
+
+    def __len__(self) -> int:
+        return len(self.current) + len(self.removed)
+
+    def _take(self, path: str) -> str | None:
+        """
+        Detach whatever is at path now and return where it came from: CREATE,
+        the pre-batch path of a row, or None if the path is known to be empty.
+        """
+        if path in self.current:
+            origin = self.current.pop(path)
+            self.origins.discard(origin)
+            return origin
+        if path in self.removed or path in self.origins:
+            return None
+        return path
+
+    def created(self, path: str):
+        if path in self.current:
+            return
+        if path in self.removed:
+            # A delete followed by a create is an in-place replace: keep the existing row
+            self.removed.discard(path)
+        else:
+            self.current[path] = CREATE
+
+    def deleted(self, path: str):
+        origin = self._take(path)
+        # Deleting a moved file deletes the row at its original path
+        if origin not in (None, CREATE):
+            self.removed.add(origin)
+
+    def moved(self, src: str, dest: str):
+        origin = self._take(src)
+        # A rename onto a file replaces it. A row still at its pre-batch path
+        # (replaced == dest) is deleted by apply_files, since it is not known
+        # here whether one exists
+        replaced = self._take(dest)
+        if replaced not in (None, CREATE, origin, dest):
+            self.removed.add(replaced)
+        if origin is None:
+            origin = CREATE
+        if origin != dest:
+            self.current[dest] = origin
+            if origin != CREATE:
+                self.origins.add(origin)
+
+
+class ChangeBatch:
+    """
+    Pending changes, kept as an ordered list of steps.
+
+    A FILES step is a FileChanges coalescing every file event since the last
+    TREE step. A TREE step is a folder move or delete applied to the whole
+    subtree at once. File changes are only coalesced between tree steps, which
+    keeps the original event order wherever it matters (e.g. a file moved out
+    of a folder that is then deleted).
+    """
+
+    def __init__(self):
+        self.steps = []
+        self.events = 0
+        self.first_event = None
+        self.last_event = None
+
+    def __len__(self) -> int:
+        return sum(len(payload) if kind == FILES else 1 for kind, payload in self.steps)
+
+    def _files(self) -> FileChanges:
+        now = time.monotonic()
+        self.first_event = self.first_event or now
+        self.last_event = now
+        if not self.steps or self.steps[-1][0] != FILES:
+            self.steps.append((FILES, FileChanges()))
+        return self.steps[-1][1]
+
+    def created(self, path: str):
+        self._files().created(path)
+
+    def deleted(self, path: str):
+        self._files().deleted(path)
+
+    def moved(self, src: str, dest: str):
+        self._files().moved(src, dest)
+
+    def tree_deleted(self, path: str):
+        self._files()
+        self.steps.append((TREE, (DELETE, path, None)))
+
+    def tree_moved(self, src: str, dest: str):
+        self._files()
+        self.steps.append((TREE, (MOVE, src, dest)))
+
+    def ready(self, debounce: float, max_delay: float) -> bool:
+        """True once events have been quiet for debounce seconds, or max_delay has passed."""
+        if not len(self):
+            return False
+        now = time.monotonic()
+        return now - self.last_event >= debounce or now - self.first_event >= max_delay
+
+    def take(self) -> list:
+        """Return the pending steps and start a new batch (events are reset too)."""
+        steps = [(kind, payload) for kind, payload in self.steps if payload]
+        self.__init__()
+        return steps
+
+
+class DriveEventHandler(FileSystemEventHandler):
+    """Translate watchdog events into ChangeBatch calls on canonical relative paths."""
+
+    def __init__(self, root: str, batch: ChangeBatch, lock: threading.Lock):
+        self.root = root
+        self.batch = batch
+        self.lock = lock
+
+    def _relative(self, path: str) -> str | None:
+        relative = normalize_path(os.path.relpath(path, self.root))
+        if not relative or relative.startswith(".."):
+            return None
+        name = relative.rpartition(SEPARATOR)[2]
+        if name in IGNORE_NAMES or name.endswith(IGNORE_SUFFIXES):
+            return None
+        return relative
+
+    def _scan(self, directory: str):
+        """Queue every file under a folder that appeared in one event (created or moved in)."""
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                relative = self._relative(os.path.join(root, filename))
+                if relative:
+                    self.batch.created(relative)
+
+    def on_created(self, event):
+        with self.lock:
+            self.batch.events += 1
+            if event.is_directory:
+                self._scan(event.src_path)
+            elif relative := self._relative(event.src_path):
+                self.batch.created(relative)
+
+    def on_deleted(self, event):
+        with self.lock:
+            self.batch.events += 1
+            relative = self._relative(event.src_path)
+            if not relative:
+                return
+            if event.is_directory:
+                self.batch.tree_deleted(relative)
+            else:
+                self.batch.deleted(relative)
+
+    def on_moved(self, event):
+        with self.lock:
+            self.batch.events += 1
+            src = self._relative(event.src_path)
+            dest = self._relative(event.dest_path)
+            if event.is_directory:
+                if src and dest:
+                    self.batch.tree_moved(src, dest)
+                elif dest:
+                    self._scan(event.dest_path)
+                elif src:
+                    self.batch.tree_deleted(src)
+            elif src and dest:
+                self.batch.moved(src, dest)
+            elif dest:
+                self.batch.created(dest)
+            elif src:
+                self.batch.deleted(src)
+
+
+def ensure_folders(cur, folder_paths: set[str]):
+    """Insert every folder in folder_paths (and its ancestors) that does not exist yet."""
+    chains = set()
+    for folder in folder_paths:
+        segments = split_path(folder)
+        for depth in range(1, len(segments) + 1):
+            chains.add(tuple(segments[:depth]))
+
+    # Parents first, so each child can look its parent up by full_path
+    for segments in sorted(chains, key=len):
+        full_path = SEPARATOR.join(segments)
+        parent_path = SEPARATOR.join(segments[:-1]) or None
+        cur.execute(
+            """
+            INSERT INTO folders (name, parent_id, full_path, level)
+            VALUES (%s, (SELECT id FROM folders WHERE full_path = %s), %s, %s)
+            ON CONFLICT (full_path) DO NOTHING
+            """,
+            (segments[-1], parent_path, full_path, len(segments) - 1),
+        )
+
+
+def apply_tree(cur, op: str, src: str, dest: str | None, location: str):
+    """Delete or move a whole folder subtree with set-based statements."""
+    src_like = escape_like(src) + SEPARATOR + "%"
+    if op == DELETE:
+        cur.execute(
+            "DELETE FROM documents WHERE location = %s AND path LIKE %s",
+            (location, src_like),
+        )
+        cur.execute(
+            "DELETE FROM folders WHERE full_path = %s OR full_path LIKE %s",
+            (src, src_like),
+        )
+        return
+
+    dest_parent, dest_name = split_folder(dest)
+    ensure_folders(cur, {dest_parent} - {""})
+    level_shift = len(split_path(dest)) - len(split_path(src))
+    cur.execute(
+        "UPDATE documents SET path = %s || substr(path, %s) WHERE location = %s AND path LIKE %s",
+        (dest, len(src) + 1, location, src_like),
+    )
+    cur.execute(
+        """
+        UPDATE folders SET full_path = %s || substr(full_path, %s), level = level + %s
+        WHERE full_path = %s OR full_path LIKE %s
+        """,
+        (dest, len(src) + 1, level_shift, src, src_like),
+    )
+    cur.execute(
+        """
+        UPDATE folders SET name = %s, parent_id = (SELECT id FROM folders WHERE full_path = %s)
+        WHERE full_path = %s
+        """,
+        (dest_name, dest_parent or None, dest),
+    )
+
+
+def apply_files(cur, files: FileChanges, location: str, metrics: Metrics):
+    """Apply one coalesced set of file creates, deletes and moves with set-based statements."""
+    from db_connection import copy_rows
+
+    moves = {dest: src for dest, src in files.current.items() if src != CREATE}
+    # Rows still at a move destination were replaced by the moved file, unless
+    # they are being moved away themselves
+    deleted = files.removed | (moves.keys() - files.origins)
+
+    if deleted:
+        cur.execute(
+            "DELETE FROM documents WHERE location = %s AND path = ANY(%s)",
+            (location, sorted(deleted)),
+        )
+        metrics.count("deletes", cur.rowcount)
+
+    if not files.current:
+        return
+
+    ensure_folders(cur, {split_folder(path)[0] for path in files.current} - {""})
+
+    cur.execute(
+        """
+        CREATE TEMP TABLE staging_changes (
+          src TEXT, path TEXT, title TEXT, file_type TEXT, folder TEXT
+        ) ON COMMIT DROP
+        """
+    )
+
+    def rows():
+        for path, src in files.current.items():
+            folder, name = split_folder(path)
+            yield (None if src == CREATE else src, path, name, get_file_type(name), folder or None)
+
+    copy_rows(cur, "staging_changes", rows())
+
+    if moves:
+        # Every move in one statement, so swaps and rename chains cannot collide
+        cur.execute(
+            """
+            UPDATE documents d
+            SET path = s.path, title = s.title, file_type = s.file_type, folder_id = f.id
+            FROM staging_changes s
+            LEFT JOIN folders f ON f.full_path = s.folder
+            WHERE d.location = %s AND d.path = s.src
+            """,
+            (location,),
+        )
+        metrics.count("moves", cur.rowcount)
+
+    # New files, and moves whose original was never imported
+    cur.execute(
+        """
+        INSERT INTO documents (title, file_url, file_type, status, location, path, folder_id)
+        SELECT s.title, '', s.file_type, 'unclassified', %s, s.path, f.id
+        FROM staging_changes s
+        LEFT JOIN folders f ON f.full_path = s.folder
+        WHERE NOT EXISTS (SELECT 1 FROM documents d WHERE d.location = %s AND d.path = s.path)
+        """,
+        (location, location),
+    )
+    metrics.count("upserts", cur.rowcount)
+    # A batch may hold several FILES steps in its one transaction
+    cur.execute("DROP TABLE staging_changes")
+
+
+def apply_batch(conn, steps: list, location: str, metrics: Metrics):
+    """Write one batch of steps to documents and folders in a single transaction."""
+    with conn, conn.cursor() as cur:
+        for kind, payload in steps:
+            if kind == TREE:
+                apply_tree(cur, *payload, location)
+                metrics.count("tree_ops")
+            else:
+                apply_files(cur, payload, location, metrics)
+
+
+def print_batch(steps: list):
+    """Dry-run output: show what apply_batch would do."""
+    for kind, payload in steps:
+        if kind == TREE:
+            op, src, dest = payload
+            print(f"   [TREE {op.upper()}] {src}" + (f" -> {dest}" if dest else ""))
+            continue
+        for path in sorted(payload.removed):
+            print(f"   [DELETE] {path}")
+        for path, src in payload.current.items():
+            label = "CREATE" if src == CREATE else f"MOVE {src} ->"
+            print(f"   [{label}] {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch the local drive and sync changes into the database")
+    parser.add_argument("--root", default=SOURCE_DIRECTORY, help="Directory to watch (default: crawler SOURCE_DIRECTORY)")
+    parser.add_argument("--location", default=LOCATION_UUID, help="Location id written on new documents")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS, help="Quiet period before a batch is applied")
+    parser.add_argument("--max-delay", type=float, default=MAX_DELAY_SECONDS, help="Longest a change may wait during a burst")
+    parser.add_argument("--dry-run", action="store_true", help="Print batches instead of writing to the database")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"[ERROR] Directory not found: {args.root}")
+        return
+
+    conn = None
+    if not args.dry_run:
+        from db_connection import connect
+        conn = connect()
+
+    metrics = Metrics("watch", args.metrics, live=False)
+    lock = threading.Lock()
+    batch = ChangeBatch()
+    observer = Observer()
+    observer.schedule(DriveEventHandler(args.root, batch, lock), args.root, recursive=True)
+    observer.start()
+
+    print(f"[INFO] Watching {args.root} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(0.25)
+            with lock:
+                if not batch.ready(args.debounce, args.max_delay):
+                    continue
+                events = batch.events
+                steps = batch.take()
+
+            with metrics.stage("apply"):
+                metrics.count("events", events)
+                if conn is None:
+                    print_batch(steps)
+                else:
+                    try:
+                        apply_batch(conn, steps, args.location, metrics)
+                    except Exception as e:
+                        # Keep watching; the next crawl/import can repair anything missed
+                        print(f"[ERROR] Failed to apply batch of {len(steps)} steps: {e}")
+    except KeyboardInterrupt:
+        print("\n[INFO] Stopping watcher...")
+    finally:
+        observer.stop()
+        observer.join()
+        if conn is not None:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()